@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Benchmark event-cell parsing and CSV conversion on a synthetic Open-sized export.
+
+    python scripts/bench_convert_data.py --rows 100000 --events 10
+"""
+
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from convert_data import convert_csv_to_json, extract_athlete_info, parse_event_result, tokenize_event_result
+from raw_scores import ScoreCache
+from synthetic import write_synthetic_csv
+
+
+def timed(label: str, fn, count: int) -> None:
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<24} {elapsed:8.3f} s  {count / elapsed:>12,.0f} /s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "xfit-leaderboard-2024-M.csv")
+        write_synthetic_csv(csv_path, args.rows, args.events)
+
+        with open(csv_path, "r", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            events = reader.fieldnames[3:]
+            rows = list(reader)
+        cells = [(e, row[e]) for row in rows for e in events]
+        names = [row["NAME"] for row in rows]
+
+        print(f"{args.rows:,} rows x {args.events} events ({len(cells):,} cells)")
+        scores = ScoreCache()
+        timed("tokenize_event_result", lambda: [tokenize_event_result(c, e, scores) for e, c in cells], len(cells))
+        timed("parse_event_result", lambda: [parse_event_result(c) for _, c in cells], len(cells))
+        timed("extract_athlete_info", lambda: [extract_athlete_info(n) for n in names], len(names))
+        timed("convert_csv_to_json", lambda: convert_csv_to_json(csv_path, os.path.join(tmp, "out.json")), args.rows)
+
+
+if __name__ == "__main__":
+    main()
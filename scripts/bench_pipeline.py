@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Benchmark the analysis pipeline on synthetic leaderboards of any size.
+
+Each (athletes, events) size is written as a synthetic CSV export, converted to
+the app JSON schema and pushed through every stage: conversion, matrix load,
+compute_leaderboard, batch_points per registered method, the ±1 swap scan
+(closed form, plus the ripple engine on small fields) and the time-gap
+reports. Timings go to a JSON file; --compare prints the ratio against an
+earlier run so regressions show up between versions.
+
+    python scripts/bench_pipeline.py --athletes 40 1000 100000 --events 5 20
+    python scripts/bench_pipeline.py --athletes 40 1000 --compare results/bench_pipeline-old.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from convert_data import convert_csv_to_json
+from fragility import analyze
+from leaderboard_matrix import LeaderboardMatrix
+from ripple_engine import RippleEngine
+from scoring import batch_points, method_names
+from synthetic import write_synthetic_csv
+from time_gaps import TimeGapIndex
+
+
+def timed(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    """Best and median wall time of `repeat` calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {"best": min(times), "median": statistics.median(times), "repeat": repeat}
+
+
+def bench_size(num_athletes: int, num_events: int, repeat: int, ripple_max: int, seed: int) -> List[Dict]:
+    """Time every stage on one synthetic field; one record per stage."""
+    records = []
+
+    def record(stage: str, fn: Callable[[], object]) -> None:
+        result = timed(fn, repeat)
+        records.append({"athletes": num_athletes, "events": num_events, "stage": stage, **result})
+        print(f"{num_athletes:>8,} x {num_events:<3} {stage:<28} {result['best']:10.4f} s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "xfit-leaderboard-2024-M.csv")
+        json_path = os.path.join(tmp, "leaderboard_data-men.json")
+        write_synthetic_csv(csv_path, num_athletes, num_events, seed=seed)
+
+        # The converter prints per call; keep the table readable
+        def convert() -> None:
+            with contextlib.redirect_stdout(io.StringIO()):
+                convert_csv_to_json(csv_path, json_path)
+
+        record("convert_csv_to_json", convert)
+        with open(json_path, encoding="utf-8") as f:
+            data = json.load(f)
+
+    record("LeaderboardMatrix.from_data", lambda: LeaderboardMatrix.from_data(data))
+    matrix = LeaderboardMatrix.from_data(data)
+    matrix.scores  # parse every result cell outside the timed stages
+    record("compute_leaderboard", lambda: matrix.compute_leaderboard())
+    for method in method_names():
+        record(f"batch_points[{method}]", lambda method=method: batch_points(matrix, method))
+
+    record("swap_scan[official]", lambda: analyze(matrix, "official"))
+    record("swap_scan[normalized]", lambda: analyze(matrix, "normalized"))
+    if num_athletes <= ripple_max:
+        record("ripple_engine.jme_scan", lambda: sum(1 for _ in RippleEngine.from_matrix(matrix).jme_scan()))
+
+    record("TimeGapIndex.from_data", lambda: TimeGapIndex.from_data(data))
+    index = TimeGapIndex.from_data(data)
+    record("gap_stats", lambda: index.gap_stats([25, 75, 90]))
+    record("points_gain[1..5s]", lambda: index.points_gain([1, 2, 3, 4, 5]))
+    return records
+
+
+def compare(records: List[Dict], previous_path: str) -> None:
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {(r["athletes"], r["events"], r["stage"]): r for r in json.load(f)["records"]}
+    print(f"\nvs {previous_path} (best time, new / old)")
+    for r in records:
+        old = previous.get((r["athletes"], r["events"], r["stage"]))
+        if old and old["best"] > 0:
+            ratio = r["best"] / old["best"]
+            # Sub-millisecond stages are timer noise
+            flag = "  SLOWER" if ratio > 1.2 and r["best"] > 1e-3 else ""
+            print(f"{r['athletes']:>8,} x {r['events']:<3} {r['stage']:<28} {ratio:8.2f}x{flag}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--athletes", nargs="+", type=int, default=[40, 1000, 100_000])
+    parser.add_argument("--events", nargs="+", type=int, default=[10])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--ripple-max", type=int, default=2000, help="largest field to run the ripple engine scan on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="results/bench_pipeline.json")
+    parser.add_argument("--compare", metavar="JSON", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    records = []
+    for num_events in args.events:
+        for num_athletes in args.athletes:
+            records.extend(bench_size(num_athletes, num_events, args.repeat, args.ripple_max, args.seed))
+
+    meta = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": args.seed,
+        "repeat": args.repeat,
+    }
+    Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "records": records}, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        compare(records, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,38 +2,84 @@ import csv
 import json
 import re
 
+from raw_scores import ScoreCache, normalize_score
+from scale_tables import OFFICIAL_SCALES, full_scale, get_place_string, official_scale, ordinal_map
 
-def parse_event_result(event_str):
-    """Parse event result string like '8th (48:54.00) 72 pts' or '1st (02:35.00) 100 pts'"""
-    if not event_str or event_str.strip() == "":
+
+# "8th (48:54.00) 72 pts", "28th (CAP+6) 6 pts", "30th (265 lb)" (points may be missing)
+_EVENT_RESULT_RE = re.compile(
+    r"(\d+)(?:st|nd|rd|th)\s+\((?:CAP\+(\d+)\)|([^)]+)\))(?:\s+(\d+)\s+pts)?"
+)
+_ORDINALS = ("st", "nd", "rd", "th")
+
+
+def _split_event_result(event_str):
+    """'8th (48:54.00) 72 pts' -> (8, '48:54.00', 72, is_cap), or None."""
+    if not event_str:
         return None
 
-    # Handle CAP cases like "28th (CAP+6) 6 pts" or "30th (CAP+3)" (missing points)
-    cap_match = re.match(r"(\d+)(?:st|nd|rd|th)\s+\(CAP\+(\d+)\)(?:\s+(\d+)\s+pts)?", event_str)
-    if cap_match:
-        place = int(cap_match.group(1))
-        cap_plus = int(cap_match.group(2))
-        points = int(cap_match.group(3)) if cap_match.group(3) else 0  # Default to 0 if points missing
-        return {"place": place, "time": f"CAP+{cap_plus}", "points": points}
+    # Fast path for well-formed cells: "<n><ordinal> (<result>)[ <pts> pts]"
+    head, _, rest = event_str.partition(" (")
+    time, closed, tail = rest.partition(")")
+    place_s, cap, points_s = head[:-2], None, None
+    if not (closed and time and place_s.isdecimal() and head[-2:] in _ORDINALS and "(" not in time):
+        tail = None
+    elif tail:
+        pts = tail.split(None, 2)
+        if tail[0] in " \t" and len(pts) >= 2 and pts[0].isdecimal() and pts[1] == "pts":
+            points_s = pts[0]
+        elif tail[0] not in " \t" or pts:
+            tail = None  # anything unusual goes through the regex
+    if tail is None:
+        m = _EVENT_RESULT_RE.match(event_str)
+        if m is None:
+            return None
+        place_s, cap, time, points_s = m.groups()
+    elif time.startswith("CAP+") and time[4:].isdecimal():
+        cap = time[4:]
+
+    points = int(points_s) if points_s else 0  # Default to 0 if points missing
+    if cap is not None:
+        return int(place_s), f"CAP+{int(cap)}", points, True
+    return int(place_s), time, points, False
+
+
+def tokenize_event_result(event_str, event_name="", scores=None):
+    """
+    Single-pass tokenizer for an event cell.
+
+    Returns (place, time, points, kind, value) or None, where kind and value
+    are raw_scores.normalize_score()'s reading of the result in the context of
+    `event_name` (kind None and value NaN if the result is unparseable). Pass
+    one ScoreCache as `scores` for a whole run so each distinct result string
+    is parsed once.
+    """
+    split = _split_event_result(event_str)
+    if split is None:
+        return None
+    place, time, points, _ = split
+    score = normalize_score(event_name, time) if scores is None else scores(event_name, time)
+    return place, time, points, score.kind, score.value
 
-    # Handle regular cases like "8th (48:54.00) 72 pts" or "30th (265 lb)" (missing points)
-    match = re.match(r"(\d+)(?:st|nd|rd|th)\s+\(([^)]+)\)(?:\s+(\d+)\s+pts)?", event_str)
-    if match:
-        place = int(match.group(1))
-        time = match.group(2)
-        points = int(match.group(3)) if match.group(3) else 0  # Default to 0 if points missing
-        return {"place": place, "time": time, "points": points}
 
-    return None
+def parse_event_result(event_str):
+    """Parse event result string like '8th (48:54.00) 72 pts' or '1st (02:35.00) 100 pts'"""
+    split = _split_event_result(event_str)
+    if split is None:
+        return None
+    place, time, points, _ = split
+    return {"place": place, "time": time, "points": points}
 
 
 def extract_athlete_info(name_str):
     """Extract athlete information from the name string"""
     lines = name_str.strip().split("\n")
-    name = lines[0].strip()
 
-    info = {"name": name, "country": "", "region": "", "affiliate": "", "age": "", "height_weight": ""}
+    info = {"name": lines[0].strip(), "country": "", "region": "", "affiliate": "", "age": "", "height_weight": ""}
 
+    # Positional fields fill in order: country, region, then affiliate
+    positional = ("country", "region")
+    filled = 0
     for line in lines[1:]:
         line = line.strip()
         if not line or line == "View Profile":
@@ -41,34 +87,17 @@ def extract_athlete_info(name_str):
 
         if "Age" in line:
             info["age"] = line
-        elif "in |" in line or "cm |" in line:
+        elif " |" in line and ("in |" in line or "cm |" in line):
             info["height_weight"] = line
-        elif info["country"] == "":
-            info["country"] = line
-        elif info["region"] == "":
-            info["region"] = line
+        elif filled < 2:
+            info[positional[filled]] = line
+            filled += 1
         else:
             info["affiliate"] = line
 
     return info
 
 
-def get_place_string(place: int) -> str:
-    if place == 1:
-        return "1st"
-    if place == 2:
-        return "2nd"
-    if place == 3:
-        return "3rd"
-    if place % 10 == 1 and place != 11:
-        return f"{place}st"
-    if place % 10 == 2 and place != 12:
-        return f"{place}nd"
-    if place % 10 == 3 and place != 13:
-        return f"{place}rd"
-    return f"{place}th"
-
-
 def derive_events_from_headers(fieldnames):
     """Infer event column names from CSV headers by excluding core columns."""
     if not fieldnames:
@@ -98,192 +127,197 @@ def build_event_point_map(athletes, events):
             place = res.get("place")
             pts = res.get("points", 0) or 0
             if isinstance(place, int):
-                place_str = get_place_string(place)
                 # Prefer the highest points seen for a given place (safety against inconsistencies)
-                current = event_point_map[event].get(place_str)
+                current = event_point_map[event].get(place)
                 if current is None or pts > current:
-                    event_point_map[event][place_str] = pts
+                    event_point_map[event][place] = pts
                 # Track field size by max place observed
                 if place > event_field_size[event]:
                     event_field_size[event] = place
 
+    # Ordinal keys only for the JSON output
+    event_point_map = {
+        event: {get_place_string(place): pts for place, pts in place_points.items()}
+        for event, place_points in event_point_map.items()
+    }
     return event_point_map, event_field_size
 
 
+class EventPointAccumulator:
+    """
+    Running equivalent of build_event_point_map() for streamed conversion.
+
+    Points are kept in one place-indexed list per event (-1 = place not seen),
+    so memory grows with the largest place rather than with athlete dicts.
+    """
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.points_by_place = {event: [] for event in self.events}
+
+    def add(self, athlete):
+        for event, res in (athlete.get("events", {}) or {}).items():
+            if not res:
+                continue
+            place = res.get("place")
+            if not isinstance(place, int) or place < 0:
+                continue
+            pts = res.get("points", 0) or 0
+            seen = self.points_by_place[event]
+            if place >= len(seen):
+                seen.extend([-1] * (place + 1 - len(seen)))
+            # Prefer the highest points seen for a given place (safety against inconsistencies)
+            if pts > seen[place]:
+                seen[place] = pts
+
+    def event_point_map(self):
+        return {event: dict(self.iter_event_points(event)) for event in self.events}
+
+    def iter_event_points(self, event):
+        """(ordinal place, points) pairs for one event, in place order."""
+        for place, pts in enumerate(self.points_by_place[event]):
+            if pts >= 0:
+                yield get_place_string(place), pts
+
+    def event_field_size(self):
+        # Field size is the max place observed
+        return {event: max(len(seen) - 1, 0) for event, seen in self.points_by_place.items()}
+
+
+class FinishIndexAccumulator:
+    """
+    Per-event finish-order index ("event_finish_index" in the JSON), built once
+    at conversion so analyses load it instead of re-sorting results.
+
+    For each event, over the athletes with a place (IDs are positions in the
+    athletes list):
+        athletes        : athlete IDs by place, ties in row order
+        places          : place at each position
+        groups          : first position of each tie group (athletes sharing a place)
+        group           : tie group of each position
+        position        : each athlete ID's position (-1 = no place)
+        kinds, scores   : raw_scores.normalize_score() kind and value of each position's result (null if unparseable)
+        points_by_place : points per place, highest over tied rows (-1 = place not seen)
+
+    The finisher directly above athlete a is athletes[position[a] - 1]; the
+    nearest strictly better place starts at groups[group[position[a]] - 1].
+    """
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.rows = {event: [] for event in self.events}
+        self.num_athletes = 0
+        self.scores = ScoreCache()
+
+    def add(self, athlete):
+        athlete_id = self.num_athletes
+        self.num_athletes += 1
+        for event, res in (athlete.get("events", {}) or {}).items():
+            self.add_result(athlete_id, event, res)
+
+    def add_result(self, athlete_id, event, res):
+        if not res:
+            return
+        place = res.get("place")
+        if not isinstance(place, int) or place <= 0:
+            return
+        score = self.scores(event, res.get("time") or "")
+        value = None if score.kind is None else score.value
+        self.rows[event].append((place, athlete_id, score.kind, value, res.get("points", 0) or 0))
+
+    def event_index(self, event):
+        rows = sorted(self.rows[event], key=lambda r: (r[0], r[1]))
+        position = [-1] * self.num_athletes
+        groups, group = [], []
+        points_by_place = [-1] * ((rows[-1][0] if rows else 0) + 1)
+        for pos, (place, athlete_id, _, _, pts) in enumerate(rows):
+            position[athlete_id] = pos
+            if not groups or place != rows[pos - 1][0]:
+                groups.append(pos)
+            group.append(len(groups) - 1)
+            if pts > points_by_place[place]:
+                points_by_place[place] = pts
+        return {
+            "athletes": [r[1] for r in rows],
+            "places": [r[0] for r in rows],
+            "groups": groups,
+            "group": group,
+            "position": position,
+            "kinds": [r[2] for r in rows],
+            "scores": [r[3] for r in rows],
+            "points_by_place": points_by_place,
+        }
+
+    def finish_index(self):
+        return {event: self.event_index(event) for event in self.events}
+
+
+def build_finish_index(athletes, events):
+    """event_finish_index for a list of converted athletes (see FinishIndexAccumulator)."""
+    accumulator = FinishIndexAccumulator(events)
+    for athlete in athletes:
+        accumulator.add(athlete)
+    return accumulator.finish_index()
+
+
 def build_official_scales_2024():
     """Return official 2024 scales for fields of size 40, 30, 20, 10 as place->points dicts."""
+    return {str(size): ordinal_map(full_scale(2024, size)) for size in sorted(OFFICIAL_SCALES[2024], reverse=True)}
+
+
+def build_official_event_point_map_2024(event_field_size):
+    """Choose the appropriate 2024 scale per event by observed field size, truncated to it."""
+    event_map = {event: ordinal_map(official_scale(2024, size)) for event, size in event_field_size.items()}
+    return build_official_scales_2024(), event_map
+
 
-    def place_key(i: int) -> str:
-        return get_place_string(i)
-
-    scale40_vals = [
-        100,
-        97,
-        94,
-        91,
-        88,
-        85,
-        82,
-        79,
-        76,
-        73,
-        70,
-        67,
-        64,
-        61,
-        58,
-        55,
-        52,
-        49,
-        46,
-        43,
-        40,
-        37,
-        34,
-        32,
-        30,
-        28,
-        26,
-        24,
-        22,
-        20,
-        18,
-        16,
-        14,
-        12,
-        10,
-        8,
-        6,
-        4,
-        2,
-        0,
-    ]
-    scale30_vals = [
-        100,
-        96,
-        92,
-        88,
-        84,
-        80,
-        76,
-        72,
-        68,
-        64,
-        60,
-        56,
-        52,
-        48,
-        45,
-        42,
-        39,
-        36,
-        33,
-        30,
-        27,
-        24,
-        21,
-        18,
-        15,
-        12,
-        9,
-        6,
-        3,
-        0,
-    ]
-    scale20_vals = [
-        100,
-        95,
-        90,
-        85,
-        80,
-        75,
-        70,
-        65,
-        60,
-        55,
-        50,
-        45,
-        40,
-        35,
-        30,
-        25,
-        20,
-        15,
-        10,
-        0,
-    ]
-    scale10_vals = [
-        100,
-        90,
-        80,
-        70,
-        60,
-        50,
-        40,
-        30,
-        20,
-        10,
-    ]
-
-    def to_map(vals):
-        return {place_key(i + 1): vals[i] for i in range(len(vals))}
+def athlete_from_row(row, events):
+    athlete_info = extract_athlete_info(row["NAME"])
 
     return {
-        "40": to_map(scale40_vals),
-        "30": to_map(scale30_vals),
-        "20": to_map(scale20_vals),
-        "10": to_map(scale10_vals),
+        "rank": int(row["RANK"]),
+        "name": athlete_info["name"],
+        "country": athlete_info["country"],
+        "region": athlete_info["region"],
+        "affiliate": athlete_info["affiliate"],
+        "age": athlete_info["age"],
+        "height_weight": athlete_info["height_weight"],
+        "total_points": int(row["POINTS"]),
+        "events": {e: parse_event_result(row.get(e, "")) for e in events},
     }
 
 
-def build_official_event_point_map_2024(event_field_size):
-    """Choose the appropriate 2024 scale per event by observed field size."""
-    official_scales = build_official_scales_2024()
-    event_map = {}
-    for event, size in event_field_size.items():
-        # Select column based on competitor count
-        if size >= 31:
-            key = "40"
-        elif size >= 21:
-            key = "30"
-        elif size >= 11:
-            key = "20"
-        else:
-            key = "10"
-        # Truncate to observed size
-        full_map = official_scales[key]
-        truncated = {k: v for k, v in full_map.items() if int(k[:-2]) <= size}
-        event_map[event] = truncated
-    return official_scales, event_map
-
+def default_paths(year, gender):
+    """Default CSV input and JSON output names for a season/division."""
+    gender_abbreviation = "M" if gender == "men" else "W"
+    csv_path = f"xfit-leaderboard-{year}-{gender_abbreviation}.csv"
+    # Use underscore naming to match the app loader (e.g., 2024_leaderboard_data-men.json)
+    out_path = f"{year}_leaderboard_data-{gender}.json"
+    return csv_path, out_path
+
+
+def convert_csv_to_json(csv_path=None, out_path=None, year=2024, gender="men", stream=False, npz_path=None):
+    """
+    Convert a leaderboard CSV export (default xfit-leaderboard-<year>-<M|W>.csv) to the app JSON.
+    With `npz_path`, also write the compact columnar form (see leaderboard_npz.py; needs numpy).
+    """
+    default_csv, default_out = default_paths(year, gender)
+    csv_path = csv_path or default_csv
+    out_path = out_path or default_out
+    if stream:
+        if npz_path:
+            raise ValueError("npz export needs the in-memory conversion; convert without stream=True")
+        return stream_csv_to_json(csv_path, out_path, year=year, gender=gender)
 
-def convert_csv_to_json():
     athletes = []
 
-    gender_abbreviation = "M"
-    gender = "men"
-
-    with open(f"xfit-leaderboard-2024-{gender_abbreviation}.csv", "r", encoding="utf-8") as file:
+    with open(csv_path, "r", encoding="utf-8") as file:
         reader = csv.DictReader(file)
         # Derive events from headers
         events = derive_events_from_headers(reader.fieldnames)
 
         for row in reader:
-            athlete_info = extract_athlete_info(row["NAME"])
-
-            athlete = {
-                "rank": int(row["RANK"]),
-                "name": athlete_info["name"],
-                "country": athlete_info["country"],
-                "region": athlete_info["region"],
-                "affiliate": athlete_info["affiliate"],
-                "age": athlete_info["age"],
-                "height_weight": athlete_info["height_weight"],
-                "total_points": int(row["POINTS"]),
-                "events": {e: parse_event_result(row.get(e, "")) for e in events},
-            }
-
-            athletes.append(athlete)
+            athletes.append(athlete_from_row(row, events))
 
     # Derive exact points per event/place and observed field size
     event_point_map, event_field_size = build_event_point_map(athletes, events)
@@ -292,22 +326,76 @@ def convert_csv_to_json():
 
     # Create the final JSON structure (no global point_system; we keep exact observed maps instead)
     data = {
-        "year": 2024,
+        "year": year,
         "gender": gender,
         "events": events,
         "event_point_map": event_point_map,
         "official_point_scales_2024": official_point_scales_2024,
         "official_event_point_map_2024": official_event_point_map_2024,
         "event_field_size": event_field_size,
+        "event_finish_index": build_finish_index(athletes, events),
         "athletes": athletes,
     }
 
-    # Use underscore naming to match the app loader (e.g., 2024_leaderboard_data-men.json)
-    with open(f"2024_leaderboard_data-{gender}.json", "w", encoding="utf-8") as f:
+    with open(out_path, "w", encoding="utf-8") as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
     print(f"Converted {len(athletes)} athletes to JSON format")
-    print(f"Data saved to 2024_leaderboard_data-{gender}.json")
+    print(f"Data saved to {out_path}")
+
+    if npz_path:
+        from leaderboard_npz import save_npz
+
+        save_npz(data, npz_path)
+        print(f"Compact data saved to {npz_path}")
+
+
+def stream_csv_to_json(csv_path, out_path, year=2024, gender="men"):
+    """
+    Single-pass, bounded-memory conversion for Open-sized exports.
+
+    Athletes are written one per line as they are read and only the per-event
+    point aggregates are kept. The output is the same JSON document as
+    convert_csv_to_json() (compact, with "athletes" before the point maps)
+    except for "event_finish_index": sorting every result would hold the
+    whole field again, so it is left out and load_finish_index() derives it
+    when the file is read.
+    """
+    count = 0
+
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False)
+
+    with open(csv_path, "r", encoding="utf-8") as file, open(out_path, "w", encoding="utf-8") as out:
+        reader = csv.DictReader(file)
+        events = derive_events_from_headers(reader.fieldnames)
+        accumulator = EventPointAccumulator(events)
+
+        out.write(f'{{"year": {dumps(year)}, "gender": {dumps(gender)}, "events": {dumps(events)},\n"athletes": [\n')
+        for row in reader:
+            athlete = athlete_from_row(row, events)
+            accumulator.add(athlete)
+            if count:
+                out.write(",\n")
+            out.write(dumps(athlete))
+            count += 1
+        out.write("\n],\n")
+
+        event_field_size = accumulator.event_field_size()
+        official_point_scales_2024, official_event_point_map_2024 = build_official_event_point_map_2024(event_field_size)
+        # Written entry by entry: the map has one key per place and event
+        out.write('"event_point_map": {')
+        for i, event in enumerate(events):
+            out.write(f'{", " if i else ""}{dumps(event)}: {{')
+            out.write(", ".join(f"{dumps(place)}: {pts}" for place, pts in accumulator.iter_event_points(event)))
+            out.write("}")
+        out.write("},\n")
+        out.write(f'"official_point_scales_2024": {dumps(official_point_scales_2024)},\n')
+        out.write(f'"official_event_point_map_2024": {dumps(official_event_point_map_2024)},\n')
+        out.write(f'"event_field_size": {dumps(event_field_size)}}}\n')
+
+    print(f"Converted {count} athletes to JSON format (streamed)")
+    print(f"Data saved to {out_path}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Dataset discovery and per-dataset load caches for the analysis CLI.
+
+Files follow the converter's naming, `[<year>_]leaderboard_data-<division>.json`
+(or `.npz` for the compact form, preferred over the JSON unless the JSON is newer).
+Each Dataset parses its JSON and builds its LeaderboardMatrix at most once, so
+several subcommands or datasets in one invocation never re-read a file.
+"""
+
+import glob
+import json
+import os
+import re
+from fnmatch import fnmatch
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence
+
+from leaderboard_matrix import LeaderboardMatrix
+
+
+DEFAULT_DATA_DIR = "crossfit-leaderboard-remix/public"
+
+_NAME_RE = re.compile(r"^(?:(?P<year>\d{4})_)?leaderboard_data-(?P<division>[^.]+)\.(?:json|npz)$")
+
+
+def output_suffix(label: str) -> str:
+    """Suffix for results/ files; men keeps the historical un-suffixed names."""
+    return "" if label == "men" else f"-{label}"
+
+
+class Dataset:
+    def __init__(self, path: str, division: str = "", year: Optional[str] = None) -> None:
+        self.path = path
+        self.division = division
+        self.year = year
+
+    @classmethod
+    def from_path(cls, path: str) -> "Dataset":
+        m = _NAME_RE.match(os.path.basename(path))
+        if not m:
+            return cls(path, os.path.splitext(os.path.basename(path))[0])
+        return cls(path, m.group("division"), m.group("year"))
+
+    @property
+    def label(self) -> str:
+        return f"{self.year}-{self.division}" if self.year else self.division
+
+    @property
+    def suffix(self) -> str:
+        return output_suffix(self.label)
+
+    @cached_property
+    def data(self) -> Dict:
+        if self.path.endswith(".npz"):
+            from leaderboard_npz import load_npz_data
+
+            return load_npz_data(self.path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    @cached_property
+    def matrix(self) -> LeaderboardMatrix:
+        # The compact form builds the matrix without going through per-athlete dicts
+        if self.path.endswith(".npz") and "data" not in self.__dict__:
+            return LeaderboardMatrix.from_npz(self.path)
+        return LeaderboardMatrix.from_data(self.data)
+
+    def __repr__(self) -> str:
+        return f"Dataset({self.label!r}, {self.path!r})"
+
+
+def find_datasets(
+    patterns: Optional[Sequence[str]] = None,
+    division: str = "*",
+    year: str = "*",
+    data_dir: str = DEFAULT_DATA_DIR,
+) -> List[Dataset]:
+    """
+    Resolve dataset files from explicit path globs (`patterns`) or, when none are
+    given, from every leaderboard file in `data_dir`. Results are filtered by the
+    `division` and `year` globs; files without a year prefix only match year="*".
+    In `data_dir`, a .npz replaces its sibling JSON unless the JSON was modified
+    after it (re-run export-npz to refresh it); a stale .npz is skipped with a note.
+    """
+    if patterns:
+        paths = sorted({p for pattern in patterns for p in glob.glob(pattern)})
+    else:
+        paths = sorted(glob.glob(os.path.join(data_dir, "*leaderboard_data-*.json")))
+        # Prefer the compact form when both exist, unless the JSON changed since the export
+        for path in glob.glob(os.path.join(data_dir, "*leaderboard_data-*.npz")):
+            json_path = os.path.splitext(path)[0] + ".json"
+            if json_path not in paths:
+                paths.append(path)
+            elif os.path.getmtime(path) >= os.path.getmtime(json_path):
+                paths[paths.index(json_path)] = path
+            else:
+                print(f"Ignoring {path}: older than {json_path} (re-run export-npz)")
+        paths.sort()
+
+    datasets = []
+    for path in paths:
+        ds = Dataset.from_path(path)
+        if not fnmatch(ds.division, division):
+            continue
+        if year != "*" and not (ds.year and fnmatch(ds.year, year)):
+            continue
+        datasets.append(ds)
+    return datasets
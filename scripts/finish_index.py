@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""NumPy view of the converter's per-event finish-order index.
+
+convert_data.py writes "event_finish_index" into every leaderboard JSON (see
+FinishIndexAccumulator): athlete IDs by place, tie groups, typed scores and a
+place -> points array per event. load_finish_index() wraps each event's entry
+as arrays, deriving it from the athletes for files without one (streamed
+conversions and files converted before the index existed). Neighbour lookups
+are O(1):
+
+    index = load_finish_index(data)["Running Isabel"]
+    index.above(a), index.below(a)        # finisher directly above / below
+    index.group_above(a)                  # athletes on the nearest better place
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+
+class EventFinishIndex:
+    """
+    athletes : int64 [finishers] athlete IDs by place, ties in row order
+    places   : int64 [finishers] place at each position
+    groups   : int64 [tie groups + 1] first position of each tie group, then len(athletes)
+    group    : int64 [finishers] tie group of each position
+    position : int64 [athletes] each athlete's position (-1 = no place)
+    kinds    : raw_scores kind per position ("time", "load", "cap", "reps"; None if unparseable)
+    scores   : float64 [finishers] score value in the kind's unit (NaN if unparseable)
+    points_by_place : int64 [max place + 1] points per place (-1 = place not seen)
+    """
+
+    def __init__(self, entry: Dict) -> None:
+        self.athletes = np.asarray(entry["athletes"], dtype=np.int64)
+        self.places = np.asarray(entry["places"], dtype=np.int64)
+        self.groups = np.append(np.asarray(entry["groups"], dtype=np.int64), len(self.athletes))
+        self.group = np.asarray(entry["group"], dtype=np.int64)
+        self.position = np.asarray(entry["position"], dtype=np.int64)
+        self.kinds = list(entry["kinds"])
+        self.scores = np.array([np.nan if v is None else v for v in entry["scores"]], dtype=np.float64)
+        self.points_by_place = np.asarray(entry["points_by_place"], dtype=np.int64)
+
+    @property
+    def seconds(self) -> np.ndarray:
+        """scores as seconds where the result is a time, NaN elsewhere."""
+        timed = np.array([kind == "time" for kind in self.kinds], dtype=bool)
+        return np.where(timed, self.scores, np.nan)
+
+    def above(self, athlete: int) -> Optional[int]:
+        pos = self.position[athlete]
+        return int(self.athletes[pos - 1]) if pos > 0 else None
+
+    def below(self, athlete: int) -> Optional[int]:
+        pos = self.position[athlete]
+        return int(self.athletes[pos + 1]) if 0 <= pos < len(self.athletes) - 1 else None
+
+    def tie_group(self, athlete: int) -> np.ndarray:
+        """
+        Athletes sharing this athlete's place (itself included). Like the other
+        neighbour lookups, empty for an athlete without a place:
+
+        >>> index = EventFinishIndex({"athletes": [0, 2], "places": [1, 1], "groups": [0], "group": [0, 0],
+        ...                           "position": [0, -1, 1], "kinds": [None, None], "scores": [None, None],
+        ...                           "points_by_place": [-1, 100]})
+        >>> index.tie_group(2).tolist(), index.tie_group(1).tolist()
+        ([0, 2], [])
+        >>> index.group_above(1).tolist(), index.group_below(1).tolist(), index.above(1), index.below(1)
+        ([], [], None, None)
+        """
+        pos = self.position[athlete]
+        if pos < 0:
+            return self.athletes[:0]
+        g = self.group[pos]
+        return self.athletes[self.groups[g] : self.groups[g + 1]]
+
+    def group_above(self, athlete: int) -> np.ndarray:
+        """Athletes on the nearest strictly better place (empty at the top)."""
+        pos = self.position[athlete]
+        if pos < 0:
+            return self.athletes[:0]
+        g = self.group[pos]
+        return self.athletes[self.groups[g - 1] : self.groups[g]] if g > 0 else self.athletes[:0]
+
+    def group_below(self, athlete: int) -> np.ndarray:
+        """Athletes on the nearest strictly worse place (empty at the bottom)."""
+        pos = self.position[athlete]
+        if pos < 0:
+            return self.athletes[:0]
+        g = self.group[pos]
+        return self.athletes[self.groups[g + 1] : self.groups[min(g + 2, len(self.groups) - 1)]]
+
+
+def load_finish_index(data: Dict) -> Dict[str, EventFinishIndex]:
+    """Per-event EventFinishIndex of a converted leaderboard (derived from the athletes if the file predates it)."""
+    entries = data.get("event_finish_index")
+    if entries is None:
+        from convert_data import build_finish_index
+
+        entries = build_finish_index(data.get("athletes", []), data.get("events", []))
+    return {event: EventFinishIndex(entry) for event, entry in entries.items()}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""JME fragility analysis of one scoring method on one leaderboard."""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+import profiling
+from leaderboard_matrix import LeaderboardMatrix
+from rank_margins import RankMargins, fragility_counts, swap_sensitivity
+from scoring import batch_points, place_scale
+
+
+FIELDNAMES = ["method", "top1", "top1_pts", "total", "top10", "FI"]
+
+
+def method_label(method: str, k: float) -> str:
+    return method if method != "decay" else f"decay_k={k}"
+
+
+def analyze(matrix: LeaderboardMatrix, method: str = "official", k: float = 0.5, points: Optional[np.ndarray] = None) -> Dict:
+    """
+    Score the field with `method`, check every ±1 swap against the rank margins
+    and summarise the JME displacements. `points` may be passed in when already
+    scored (e.g. one slice of a decay tensor).
+    """
+    with profiling.stage("analyze.score"):
+        if points is None:
+            points = batch_points(matrix, method=method, k=k)
+    with profiling.stage("analyze.rank"):
+        margins = RankMargins.from_matrix(matrix, points)
+        order, totals = margins.order, margins.totals
+
+    # Swaps only move points on events scored by place
+    with profiling.stage("analyze.place_scales"):
+        scales = [place_scale(matrix, j, method=method, k=k) for j in range(matrix.num_events)]
+    with profiling.stage("analyze.swap_scan"):
+        sensitivity = swap_sensitivity(matrix, points, scales, margins)
+
+    # count ripple *events* that touched the Top-10
+    with profiling.stage("analyze.count"):
+        total_displacements, top10_displacements = fragility_counts(sensitivity, top=10)
+    profiling.count("analyze.calls")
+    profiling.count("analyze.swaps", int(sensitivity["valid"].sum()))
+    profiling.count("analyze.jme", total_displacements)
+
+    FI = total_displacements / (matrix.num_athletes * matrix.num_events * 2)
+
+    return {
+        "method": method_label(method, k),
+        "top1": matrix.names[order[0]],
+        "top1_pts": totals[order[0]].item(),
+        "total": total_displacements,
+        "top10": top10_displacements,
+        "FI": round(FI, 4),
+    }
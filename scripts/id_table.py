@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""Dense integer IDs for athletes and events, assigned at load time.
+
+Engines work on row / column numbers; IdTable is the only place names are
+looked up. IDs follow load order (athlete ID = row of the athletes list, event
+ID = column of the events list). Display names are not unique, so a name maps
+to every ID that carries it: id() refuses to guess between several, and
+label() gives duplicates a distinguishing suffix for reports.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+
+class IdTable:
+    """
+    names : display name per ID
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names: List[str] = list(names)
+        self._ids: Dict[str, Tuple[int, ...]] = {}
+        for i, name in enumerate(self.names):
+            self._ids[name] = self._ids.get(name, ()) + (i,)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def name(self, i: int) -> str:
+        return self.names[i]
+
+    def ids(self, name: str) -> Tuple[int, ...]:
+        """Every ID with this display name (empty if none)."""
+        return self._ids.get(name, ())
+
+    def id(self, name: str) -> int:
+        """The one ID with this display name; KeyError if none, ValueError if several share it."""
+        ids = self._ids.get(name)
+        if not ids:
+            raise KeyError(name)
+        if len(ids) > 1:
+            raise ValueError(f"{len(ids)} entries share the name {name!r} (IDs {list(ids)})")
+        return ids[0]
+
+    def resolve(self, key) -> int:
+        """An ID given either an integer ID or an unambiguous name."""
+        if isinstance(key, int) and not isinstance(key, bool):
+            if not 0 <= key < len(self.names):
+                raise KeyError(key)
+            return key
+        return self.id(key)
+
+    def duplicates(self) -> Dict[str, Tuple[int, ...]]:
+        return {name: ids for name, ids in self._ids.items() if len(ids) > 1}
+
+    def label(self, i: int) -> str:
+        """Display name, with " #k" for the k-th (k > 1) entry sharing it."""
+        name = self.names[i]
+        ids = self._ids[name]
+        return name if ids[0] == i else f"{name} #{ids.index(i) + 1}"
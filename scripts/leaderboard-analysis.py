@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+"""leaderboard-analysis: one entry point for every analysis over any set of datasets.
+
+Datasets are picked with --dataset path globs, or with --division / --year globs
+over the leaderboard files in --data-dir. Each file is parsed (and its score
+matrix built) once per invocation however many datasets are processed.
+
+Examples:
+    python scripts/leaderboard-analysis.py ripple --division "*"
+    python scripts/leaderboard-analysis.py ripple --division "*" --stream
+    python scripts/leaderboard-analysis.py ripple-moves --division men
+    python scripts/leaderboard-analysis.py rescore-sweep --division men --division women --workers 8
+    python scripts/leaderboard-analysis.py rescore-sweep --division men --profile
+    python scripts/leaderboard-analysis.py margins --division "*"
+    python scripts/leaderboard-analysis.py rank-target --division men --ranks 1 3
+    python scripts/leaderboard-analysis.py monte-carlo --division men --sims 1000000 --sigma 0.02 --seed 7
+    python scripts/leaderboard-analysis.py time-gap --year 2025
+    python scripts/leaderboard-analysis.py time-gap --division men --pool --percentiles 25 75 90
+    python scripts/leaderboard-analysis.py points-gain --year 2025 --thresholds 1 2 3 4 5
+    python scripts/leaderboard-analysis.py points-gain --year 2025 --threshold-range 0.1 30 0.1
+    python scripts/leaderboard-analysis.py convert xfit-leaderboard-2024-*.csv --year 2024
+    python scripts/leaderboard-analysis.py ingest 2025_leaderboard_data-men.json heat-*.csv
+    python scripts/leaderboard-analysis.py build-store --division "*" --store store
+    python scripts/leaderboard-analysis.py history "Jeffrey Adler" --store store
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from typing import List
+
+import numpy as np
+
+import convert_data
+import median_time_drop_2025_men
+import points_gain_within5s_2025_men
+import profiling
+import quantify_ripple
+import scoring
+import sweep_runner
+from datasets import DEFAULT_DATA_DIR, Dataset, find_datasets
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
+
+
+def resolve_datasets(args: argparse.Namespace) -> List[Dataset]:
+    datasets: List[Dataset] = []
+    seen = set()
+    for division in args.division or ["*"]:
+        for year in args.year or ["*"]:
+            for ds in find_datasets(args.dataset, division=division, year=year, data_dir=args.data_dir):
+                if ds.path not in seen:
+                    seen.add(ds.path)
+                    datasets.append(ds)
+    if not datasets:
+        sys.exit("No datasets matched the given --dataset/--division/--year filters")
+    return datasets
+
+
+# --------------------------
+# Subcommands
+# --------------------------
+def cmd_ripple(args: argparse.Namespace) -> None:
+    for ds in resolve_datasets(args):
+        print(f"== {ds.label} ({ds.path})")
+        run = quantify_ripple.stream_report if args.stream else quantify_ripple.report
+        run(ds.matrix, suffix=ds.suffix, results_dir=args.results_dir)
+
+
+def cmd_ripple_moves(args: argparse.Namespace) -> None:
+    for ds in resolve_datasets(args):
+        print(f"== {ds.label} ({ds.path})")
+        quantify_ripple.move_report(ds.matrix, suffix=ds.suffix, results_dir=args.results_dir)
+
+
+def cmd_rescore_sweep(args: argparse.Namespace) -> None:
+    datasets = {ds.label: ds.matrix for ds in resolve_datasets(args)}
+    ks = sweep_runner.resolve_ks(args.k, args.k_range)
+    sweep_runner.run_sweep(datasets, args.methods, ks, args.workers, args.results_dir)
+
+
+def cmd_margins(args: argparse.Namespace) -> None:
+    from rank_margins import export_margins
+
+    for ds in resolve_datasets(args):
+        # [<year>_]rank_margins-<division>.json, next to the leaderboard by default
+        prefix = f"{ds.year}_" if ds.year else ""
+        out_dir = args.out_dir or os.path.dirname(ds.path)
+        os.makedirs(out_dir, exist_ok=True)
+        out_path = os.path.join(out_dir, f"{prefix}rank_margins-{ds.division}.json")
+        export_margins(ds.matrix, out_path)
+        print(f"{ds.label} -> {out_path}")
+
+
+def cmd_rank_target(args: argparse.Namespace) -> None:
+    import rank_target
+
+    for ds in resolve_datasets(args):
+        print(f"== {ds.label} ({ds.path})")
+        rank_target.report(
+            ds.matrix,
+            ranks=args.ranks,
+            suffix=ds.suffix,
+            results_dir=args.results_dir,
+            method=args.method,
+            k=args.k,
+            athletes=[int(a) if a.isdigit() else a for a in args.athlete or []],
+        )
+
+
+def cmd_monte_carlo(args: argparse.Namespace) -> None:
+    import monte_carlo
+
+    for ds in resolve_datasets(args):
+        print(f"== {ds.label} ({ds.path})")
+        monte_carlo.report(
+            ds.matrix,
+            suffix=ds.suffix,
+            results_dir=args.results_dir,
+            sims=args.sims,
+            sigma=args.sigma,
+            method=args.method,
+            k=args.k,
+            seed=args.seed,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            batch_size=args.batch_size,
+        )
+
+
+def cmd_time_gap(args: argparse.Namespace) -> None:
+    from time_gaps import TimeGapIndex, pooled_gap_stats
+
+    datasets = resolve_datasets(args)
+    if args.pool:
+        print("== " + ", ".join(ds.label for ds in datasets))
+        names, stats = pooled_gap_stats([TimeGapIndex.from_data(ds.data) for ds in datasets], args.percentiles)
+        median_time_drop_2025_men.print_stats_report(names, stats, args.percentiles)
+        return
+    for ds in datasets:
+        print(f"== {ds.label} ({ds.path})")
+        if args.percentiles:
+            index = TimeGapIndex.from_data(ds.data)
+            median_time_drop_2025_men.print_stats_report(index.names, index.gap_stats(args.percentiles), args.percentiles)
+        else:
+            median_time_drop_2025_men.print_report(median_time_drop_2025_men.median_gap_rows(ds.data))
+
+
+def cmd_points_gain(args: argparse.Namespace) -> None:
+    thresholds = args.thresholds
+    if args.threshold_range:
+        start, stop, step = args.threshold_range
+        thresholds = [round(v, 6) for v in np.arange(start, stop + step / 2, step).tolist()]
+    for ds in resolve_datasets(args):
+        print(f"== {ds.label} ({ds.path})")
+        rows = points_gain_within5s_2025_men.points_gain_rows(ds.data, thresholds)
+        points_gain_within5s_2025_men.print_report(rows)
+
+
+def cmd_convert(args: argparse.Namespace) -> None:
+    paths = sorted({p for pattern in args.csv for p in glob.glob(pattern)})
+    if not paths:
+        sys.exit("No CSV files matched")
+    for path in paths:
+        # xfit-leaderboard-<year>-<M|W>.csv
+        stem = os.path.splitext(os.path.basename(path))[0]
+        gender = "women" if stem.upper().endswith("-W") else "men"
+        out_path = os.path.join(args.out_dir, f"{args.year}_leaderboard_data-{gender}.json")
+        npz_path = os.path.splitext(out_path)[0] + ".npz" if args.npz else None
+        convert_data.convert_csv_to_json(
+            path, out_path, year=args.year, gender=gender, stream=args.stream, npz_path=npz_path
+        )
+
+
+def cmd_ingest(args: argparse.Namespace) -> None:
+    from live_ingest import ingest_heats
+
+    heats = [p for pattern in args.heats for p in sorted(glob.glob(pattern))]
+    if not heats:
+        sys.exit("No heat CSV files matched")
+    ingest_heats(args.snapshot, heats, diff_path=args.diff_out, year=args.year, gender=args.gender)
+
+
+def cmd_export_npz(args: argparse.Namespace) -> None:
+    from leaderboard_npz import json_to_npz
+
+    for path in sorted({p for pattern in args.json for p in glob.glob(pattern)}):
+        npz_path = os.path.splitext(path)[0] + ".npz"
+        json_to_npz(path, npz_path)
+        print(f"{path} -> {npz_path} ({os.path.getsize(path):,} -> {os.path.getsize(npz_path):,} bytes)")
+
+
+def cmd_build_store(args: argparse.Namespace) -> None:
+    from leaderboard_store import LeaderboardStore
+
+    store = LeaderboardStore.build(args.store, resolve_datasets(args))
+    for info in store.index["datasets"]:
+        print(f"{info['label']}: {info['num_athletes']} athletes x {len(info['events'])} events")
+    print(f"Store written to {args.store}")
+
+
+def cmd_history(args: argparse.Namespace) -> None:
+    from leaderboard_store import LeaderboardStore
+
+    history = LeaderboardStore(args.store).athlete_history(args.name)
+    if not history:
+        sys.exit(f"No results for {args.name!r} in {args.store}")
+    print(json.dumps(history, indent=2, ensure_ascii=False))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="leaderboard-analysis", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument("--dataset", action="append", metavar="GLOB", help="leaderboard JSON path glob (repeatable)")
+    selection.add_argument("--division", action="append", metavar="GLOB", help="division glob, e.g. men, women, '*' (repeatable)")
+    selection.add_argument("--year", action="append", metavar="GLOB", help="season glob, e.g. 2025, 202? (repeatable)")
+    selection.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    selection.add_argument("--results-dir", default="results")
+    selection.add_argument(
+        "--profile", action="store_true", help="time the ripple / sweep stages and write a .profile.json next to their results"
+    )
+
+    p = sub.add_parser("ripple", parents=[selection], help="JME displacement scan (±1 place swaps)")
+    p.add_argument("--stream", action="store_true", help="write JSON Lines as displacements are found (flat memory)")
+    p.set_defaults(func=cmd_ripple)
+
+    p = sub.add_parser("ripple-moves", parents=[selection], help="sparse rank changes for every multi-place move")
+    p.set_defaults(func=cmd_ripple_moves)
+
+    p = sub.add_parser("rescore-sweep", parents=[selection], help="fragility sweep over scoring methods and decay k")
+    p.add_argument("--methods", nargs="+", default=sweep_runner.DEFAULT_METHODS)
+    p.add_argument("--k", nargs="+", type=float, help="explicit decay k values")
+    p.add_argument("--k-range", nargs=3, type=float, metavar=("START", "STOP", "NUM"))
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.set_defaults(func=cmd_rescore_sweep)
+
+    p = sub.add_parser("margins", parents=[selection], help="per-athlete points to the next rank up and down, for the app")
+    p.add_argument("--out-dir", help="output directory (default: next to each leaderboard)")
+    p.set_defaults(func=cmd_margins)
+
+    p = sub.add_parser("rank-target", parents=[selection], help="fewest places each athlete needed to gain to reach a rank")
+    p.add_argument("--ranks", nargs="+", type=int, default=[1, 3], help="target ranks (default: 1 3, win and podium)")
+    p.add_argument("--athlete", action="append", metavar="NAME|ID", help="athlete name or ID (repeatable; default: everyone)")
+    p.add_argument("--method", default="official", choices=[m for m in scoring.method_names() if scoring.get_method(m).by_place])
+    p.add_argument("--k", type=float, default=0.5, help="decay k")
+    p.set_defaults(func=cmd_rank_target)
+
+    p = sub.add_parser("monte-carlo", parents=[selection], help="rank distributions under random noise on raw scores")
+    p.add_argument("--sims", type=positive_int, default=10000)
+    p.add_argument("--sigma", type=float, default=0.02, help="relative noise on each raw score (default: 0.02)")
+    p.add_argument("--method", default="official", choices=scoring.method_names())
+    p.add_argument("--k", type=float, default=0.5, help="decay k")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--workers", type=int, default=os.cpu_count())
+    p.add_argument("--chunk-size", type=positive_int, default=20000, help="simulations per seeded stream (part of what --seed reproduces)")
+    p.add_argument("--batch-size", type=positive_int, default=2000, help="simulations per vectorized batch")
+    p.set_defaults(func=cmd_monte_carlo)
+
+    p = sub.add_parser("time-gap", parents=[selection], help="median gap to the next faster time per athlete")
+    p.add_argument("--percentiles", nargs="+", type=float, default=[], help="add mean/min/max and these percentiles")
+    p.add_argument("--pool", action="store_true", help="one report over all selected datasets, athletes matched by name")
+    p.set_defaults(func=cmd_time_gap)
+
+    p = sub.add_parser("points-gain", parents=[selection], help="points gained by closing gaps within N seconds")
+    p.add_argument("--thresholds", nargs="+", type=float, default=[1.0, 2.0, 3.0, 4.0, 5.0])
+    p.add_argument("--threshold-range", nargs=3, type=float, metavar=("START", "STOP", "STEP"), help="inclusive sweep, e.g. 0.1 30 0.1")
+    p.set_defaults(func=cmd_points_gain)
+
+    p = sub.add_parser("convert", help="convert leaderboard CSV exports to app JSON")
+    p.add_argument("csv", nargs="+", metavar="GLOB", help="CSV export path glob(s)")
+    p.add_argument("--year", type=int, default=2024)
+    p.add_argument("--out-dir", default=".")
+    p.add_argument("--stream", action="store_true", help="bounded-memory streaming conversion for Open-sized exports")
+    p.add_argument("--npz", action="store_true", help="also write the compact columnar .npz next to each JSON")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("ingest", help="apply heat result CSVs to a converted leaderboard in place")
+    p.add_argument("snapshot", help="leaderboard JSON to update (started empty if missing)")
+    p.add_argument("heats", nargs="+", metavar="GLOB", help="heat CSV path glob(s), applied in order")
+    p.add_argument("--diff-out", help="JSON Lines file for per-heat diffs (default <snapshot>.diff.jsonl)")
+    p.add_argument("--year", type=int, default=2024, help="year for a new snapshot")
+    p.add_argument("--gender", default="men", help="division for a new snapshot")
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("export-npz", help="write compact .npz copies of existing leaderboard JSON files")
+    p.add_argument("json", nargs="+", metavar="GLOB", help="leaderboard JSON path glob(s)")
+    p.set_defaults(func=cmd_export_npz)
+
+    p = sub.add_parser("build-store", parents=[selection], help="write the memory-mapped multi-season store")
+    p.add_argument("--store", default="store", help="store directory")
+    p.set_defaults(func=cmd_build_store)
+
+    p = sub.add_parser("history", help="one athlete's results across every season in the store")
+    p.add_argument("name", help="athlete display name")
+    p.add_argument("--store", default="store", help="store directory")
+    p.set_defaults(func=cmd_history)
+
+    return parser
+
+
+def main() -> None:
+    args = build_parser().parse_args()
+    if getattr(args, "profile", False):
+        profiling.enable()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Dense NumPy view of a leaderboard dataset shared by the analysis scripts.
+
+A dataset is loaded once into [athletes x events] arrays so scoring, ranking
+and ripple scans work on columns instead of walking athlete["events"][event]
+dicts.
+"""
+
+import json
+from functools import cached_property
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from id_table import IdTable
+from raw_scores import ScoreColumns
+from scale_tables import place_points
+
+
+def parse_point_system(point_system: Dict[str, int]) -> Dict[int, int]:
+    """Turn an ordinal-keyed {"1st": 100, ...} map into {1: 100, ...}."""
+    return place_points(point_system)
+
+
+def scale_array(place_points: Dict[int, int], size: int) -> np.ndarray:
+    """Place-indexed points lookup (index 0 unused); places missing from the map score 0."""
+    scale = np.zeros(size + 1, dtype=np.int16)
+    for place, pts in place_points.items():
+        if 0 <= place <= size:
+            scale[place] = pts
+    return scale
+
+
+class LeaderboardMatrix:
+    """
+    names       : athlete display names, row order of every matrix
+    events      : event names, column order of every matrix
+    athlete_ids : IdTable name <-> athlete ID (= row)
+    event_ids   : IdTable name <-> event ID (= column)
+    places      : int16 [athletes x events] finishing place (0 = no result; int32 for >32767 places)
+    points      : int16 [athletes x events] points as published
+    times       : [athletes][events] raw result cells ("48:54.00", "CAP+6", "265 lb")
+    raw         : float64 [athletes x events] parse_raw_score() value (NaN if unparseable)
+    lower_is_better : bool [events] direction of the raw score
+    event_scales: per-event place-indexed points lookup
+    scores      : ScoreColumns for `times` (built on first use unless supplied)
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        events: Sequence[str],
+        places: np.ndarray,
+        points: np.ndarray,
+        times: Sequence[Sequence[Optional[str]]],
+        event_point_maps: Sequence[Dict[int, int]],
+        raw: Optional[np.ndarray] = None,
+        lower_is_better: Optional[np.ndarray] = None,
+        scores: Optional[ScoreColumns] = None,
+    ) -> None:
+        self.names = list(names)
+        self.events = list(events)
+        places = np.asarray(places)
+        wide = places.size and int(places.max()) > np.iinfo(np.int16).max
+        self.places = places.astype(np.int32 if wide else np.int16, copy=False)
+        self.points = np.asarray(points, dtype=np.int16)
+        self.times = [list(row) for row in times]
+        self.num_athletes, self.num_events = self.places.shape
+
+        self.athlete_ids = IdTable(self.names)
+        self.event_ids = IdTable(self.events)
+
+        max_place = max(int(self.places.max(initial=0)), self.num_athletes) + 1
+        self.event_scales = [scale_array(m, max_place) for m in event_point_maps]
+
+        if scores is not None:
+            self.scores = scores
+
+        if raw is None:
+            raw, lower_is_better = self.scores.raw, self.scores.lower_is_better
+        self.raw = raw
+        self.lower_is_better = lower_is_better
+
+        # Rank of each name in sorted order, used as the leaderboard tie-break
+        self._name_rank = np.empty(self.num_athletes, dtype=np.int64)
+        self._name_rank[sorted(range(self.num_athletes), key=lambda i: self.names[i])] = np.arange(self.num_athletes)
+
+    @cached_property
+    def scores(self) -> ScoreColumns:
+        """Typed and legacy numeric readings of every result cell, parsed once per distinct cell."""
+        return ScoreColumns.from_cells(self.events, self.times)
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "LeaderboardMatrix":
+        events: List[str] = data["events"]
+        athletes: List[Dict] = data["athletes"]
+
+        if "event_point_map" in data:
+            point_maps = [parse_point_system(data["event_point_map"][event]) for event in events]
+        else:
+            point_maps = [parse_point_system(data["point_system"])] * len(events)
+
+        places = np.zeros((len(athletes), len(events)), dtype=np.int64)
+        points = np.zeros((len(athletes), len(events)), dtype=np.int16)
+        times: List[List[Optional[str]]] = []
+        for i, athlete in enumerate(athletes):
+            row_times: List[Optional[str]] = []
+            for j, event in enumerate(events):
+                res = athlete["events"].get(event) or {}
+                places[i, j] = res.get("place", 0) or 0
+                points[i, j] = res.get("points", 0) or 0
+                row_times.append(res.get("time"))
+            times.append(row_times)
+
+        return cls([a["name"] for a in athletes], events, places, points, times, point_maps)
+
+    @classmethod
+    def from_npz(cls, path: str) -> "LeaderboardMatrix":
+        """Build straight from the compact columnar arrays, parsing each distinct result string once."""
+        from leaderboard_npz import load_npz_arrays
+
+        meta, arrays, strings = load_npz_arrays(path)
+        events: List[str] = meta["events"]
+        time_idx = arrays["time_idx"]
+        places = arrays["places"]
+
+        if "event_point_map" in arrays:
+            point_maps = [{p: pts for p, pts in enumerate(row) if pts >= 0} for row in arrays["event_point_map"].tolist()]
+        else:
+            point_maps = [parse_point_system(meta["point_system"])] * len(events)
+
+        # Index -1 (no result) lands on the trailing None / NaN entries
+        lookup = np.array(strings + [None], dtype=object)
+        times = lookup[time_idx].tolist()
+
+        scores = ScoreColumns.from_indexed(events, strings, time_idx)
+
+        present = arrays["present"]
+        names_idx = arrays["field_name"].tolist()
+        return cls(
+            [strings[i] for i in names_idx],
+            events,
+            np.where(present, places, 0),
+            np.where(present, arrays["points"], 0),
+            times,
+            point_maps,
+            raw=scores.raw,
+            lower_is_better=scores.lower_is_better,
+            scores=scores,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "LeaderboardMatrix":
+        """Load a leaderboard JSON file, or its compact .npz form."""
+        if path.endswith(".npz"):
+            return cls.from_npz(path)
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_data(json.load(f))
+
+    # --------------------------
+    # Leaderboard
+    # --------------------------
+    def totals(self, points: Optional[np.ndarray] = None) -> np.ndarray:
+        """Row totals, summed column by column so float totals match a left-to-right sum."""
+        if points is None:
+            points = self.points
+        totals = np.zeros(self.num_athletes, dtype=np.float64 if points.dtype.kind == "f" else np.int64)
+        for j in range(points.shape[1]):
+            totals += points[:, j]
+        return totals
+
+    def compute_leaderboard(self, points: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Returns (ranks, order, totals): 1-based rank per athlete row, athlete rows
+        in leaderboard order, and the totals used. Ties break on name, then row.
+        """
+        totals = self.totals(points)
+        order = np.lexsort((self._name_rank, -totals))
+        ranks = np.empty(self.num_athletes, dtype=np.int64)
+        ranks[order] = np.arange(1, self.num_athletes + 1)
+        return ranks, order, totals
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Compact columnar (.npz) form of the leaderboard JSON.
+
+Per-athlete strings (names, countries, result cells) go into one UTF-8 string
+table referenced by int32 indices; places and points are int16 matrices
+(int32 when a field has more than 32767 places) and the parsed raw scores a
+float32 matrix. The converter's event_finish_index is not stored as such: it
+follows from the place and point matrices plus each cell's typed score (kind
+codes and values), so only those are kept and the index is rebuilt on load.
+Everything else (year, events, official scales...) is kept as a small JSON
+blob. load_npz_data() rebuilds a dict equal to the source JSON.
+"""
+
+import json
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from raw_scores import KINDS, ScoreCache, ScoreColumns
+from scale_tables import get_place_string, place_number
+
+
+FORMAT_VERSION = 1
+EVENT_KEYS = ["place", "time", "points"]
+
+
+# --------------------------
+# String table
+# --------------------------
+class StringTable:
+    def __init__(self) -> None:
+        self.index: Dict[str, int] = {}
+        self.strings: List[str] = []
+
+    def add(self, s: str) -> int:
+        i = self.index.get(s)
+        if i is None:
+            i = self.index[s] = len(self.strings)
+            self.strings.append(s)
+        return i
+
+    def to_arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        encoded = [s.encode("utf-8") for s in self.strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+def _place_dtype(max_place: int):
+    return np.int16 if max_place <= np.iinfo(np.int16).max else np.int32
+
+
+# --------------------------
+# Export
+# --------------------------
+def _checked_int(value, dtype, key: str, athlete: Dict) -> int:
+    """`value` if it is an int that `dtype` holds exactly, else ValueError (the format is lossless)."""
+    info = np.iinfo(dtype)
+    if type(value) is not int or not info.min <= value <= info.max:
+        raise ValueError(f"Unsupported {key} {value!r} for {athlete.get('name')!r}: expected an int in [{info.min}, {info.max}]")
+    return value
+
+
+def _typed_scores(
+    events: List[str], strings: List[str], time_idx: np.ndarray, placed: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """raw_scores kind codes (index into KINDS, -1 = none) and values of the placed cells."""
+    kinds = np.full(time_idx.shape, -1, dtype=np.int8)
+    values = np.full(time_idx.shape, np.nan, dtype=np.float64)
+    scores = ScoreCache()
+    for j, event in enumerate(events):
+        rows = placed[:, j]
+        ids, inverse = np.unique(time_idx[rows, j], return_inverse=True)
+        # Placed cells without a result parse as an empty string, as in the converter
+        parsed = [scores(event, strings[i] if i >= 0 else "") for i in ids.tolist()]
+        kind_table = np.array([-1 if p.kind is None else KINDS.index(p.kind) for p in parsed], dtype=np.int8)
+        kinds[rows, j] = kind_table[inverse]
+        values[rows, j] = np.array([p.value for p in parsed], dtype=np.float64)[inverse]
+    return kinds, values
+
+
+def _finish_index(
+    events: List[str], indexed: List[str], places: np.ndarray, points: np.ndarray, kinds: np.ndarray, values: np.ndarray
+) -> Dict[str, Dict]:
+    """event_finish_index (see convert_data.FinishIndexAccumulator) of the `indexed` events, from the matrices."""
+    entries = {}
+    for event in indexed:
+        j = events.index(event)
+        ids = np.flatnonzero(places[:, j] > 0)
+        # Stable sort on place keeps ties in ID order
+        athletes = ids[np.argsort(places[ids, j], kind="stable")]
+        place = places[athletes, j].astype(np.int64)
+        starts = np.r_[True, place[1:] != place[:-1]] if len(place) else np.zeros(0, dtype=bool)
+        position = np.full(len(places), -1, dtype=np.int64)
+        position[athletes] = np.arange(len(athletes))
+        points_by_place = np.full((place[-1] if len(place) else 0) + 1, -1, dtype=np.int64)
+        np.maximum.at(points_by_place, place, points[athletes, j].astype(np.int64))
+        entries[event] = {
+            "athletes": athletes.tolist(),
+            "places": place.tolist(),
+            "groups": np.flatnonzero(starts).tolist(),
+            "group": (np.cumsum(starts) - 1).tolist(),
+            "position": position.tolist(),
+            "kinds": [None if k < 0 else KINDS[k] for k in kinds[athletes, j].tolist()],
+            "scores": [None if k < 0 else v for k, v in zip(kinds[athletes, j].tolist(), values[athletes, j].tolist())],
+            "points_by_place": points_by_place.tolist(),
+        }
+    return entries
+
+
+def save_npz(data: Dict, path: str) -> None:
+    """Write a leaderboard JSON dict to `path` in the compact columnar format."""
+    events: List[str] = data["events"]
+    athletes: List[Dict] = data["athletes"]
+    num_athletes, num_events = len(athletes), len(events)
+    table = StringTable()
+
+    # Athlete scalar fields: ints stay ints, strings go through the table,
+    # anything else is JSON-encoded into the table so nothing is lost.
+    field_names = [k for k in (athletes[0] if athletes else {}) if k != "events"]
+    fields = {}
+    field_kinds = []
+    for name in field_names:
+        values = [a[name] for a in athletes]
+        if all(type(v) is int for v in values):
+            kind, column = "int", np.asarray(values, dtype=np.int64)
+        elif all(type(v) is str for v in values):
+            kind, column = "str", np.asarray([table.add(v) for v in values], dtype=np.int32)
+        else:
+            kind, column = "json", np.asarray([table.add(json.dumps(v)) for v in values], dtype=np.int32)
+        field_kinds.append([name, kind])
+        fields[f"field_{name}"] = column
+
+    present = np.zeros((num_athletes, num_events), dtype=bool)
+    places = np.zeros((num_athletes, num_events), dtype=np.int64)
+    points = np.zeros((num_athletes, num_events), dtype=np.int16)
+    time_idx = np.full((num_athletes, num_events), -1, dtype=np.int32)
+    for i, athlete in enumerate(athletes):
+        if [k for k in athlete if k != "events"] != field_names:
+            raise ValueError(f"Athlete {athlete.get('name')!r} has different fields from the first athlete")
+        results = athlete["events"]
+        if list(results) != events:
+            raise ValueError(f"Athlete {athlete.get('name')!r} events do not match the event list")
+        for j, event in enumerate(events):
+            res = results[event]
+            if res is None:
+                continue
+            if list(res) != EVENT_KEYS:
+                raise ValueError(f"Unsupported event result keys {list(res)} for {athlete.get('name')!r}")
+            present[i, j] = True
+            places[i, j] = _checked_int(res["place"], places.dtype, "place", athlete)
+            points[i, j] = _checked_int(res["points"], points.dtype, "points", athlete)
+            if res["time"] is not None:
+                time_idx[i, j] = table.add(res["time"])
+
+    # Each distinct result string is parsed once
+    raw = ScoreColumns.from_indexed(events, table.strings, time_idx).raw.astype(np.float32)
+
+    arrays = {
+        "format_version": np.asarray(FORMAT_VERSION),
+        "present": present,
+        "places": places.astype(_place_dtype(int(places.max(initial=0)))),
+        "points": points,
+        "time_idx": time_idx,
+        "raw": raw,
+        **fields,
+    }
+
+    meta = {k: v for k, v in data.items() if k not in ("athletes", "event_point_map", "event_finish_index")}
+    meta["_key_order"] = list(data)
+    meta["_athlete_fields"] = field_kinds
+
+    # As JSON the finish index outweighs everything else in the file, so keep what it derives from
+    if "event_finish_index" in data:
+        indexed = list(data["event_finish_index"])
+        if any(event not in events for event in indexed):
+            raise ValueError("event_finish_index covers events missing from the event list")
+        placed = present & (places > 0)
+        kinds, values = _typed_scores(events, table.strings, time_idx, placed)
+        if _finish_index(events, indexed, places, points, kinds, values) != data["event_finish_index"]:
+            raise ValueError("event_finish_index does not match the athletes' results; reconvert the file")
+        meta["_finish_index_events"] = indexed
+        arrays["score_kind"] = kinds
+        arrays["score_value"] = np.where(placed, values, 0.0)
+
+    # event_point_map grows with field size, so it is stored as a place-indexed matrix
+    if "event_point_map" in data:
+        parsed = [{place_number(k): (k, v) for k, v in data["event_point_map"][e].items()} for e in events]
+        max_place = max((max(p, default=0) for p in parsed), default=0)
+        point_map = np.full((num_events, max_place + 1), -1, dtype=np.int32)
+        for j, place_points in enumerate(parsed):
+            for place, (key, pts) in place_points.items():
+                if key != get_place_string(place) or type(pts) is not int or pts < 0:
+                    raise ValueError(f"Unsupported event_point_map entry {key!r}: {pts!r}")
+                point_map[j, place] = pts
+        arrays["event_point_map"] = point_map
+
+    arrays["meta"] = np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"), dtype=np.uint8)
+    arrays["string_blob"], arrays["string_offsets"] = table.to_arrays()
+    np.savez_compressed(path, **arrays)
+
+
+def json_to_npz(json_path: str, npz_path: str) -> None:
+    with open(json_path, "r", encoding="utf-8") as f:
+        save_npz(json.load(f), npz_path)
+
+
+# --------------------------
+# Load
+# --------------------------
+def load_npz_arrays(path: str) -> Tuple[Dict, Dict[str, np.ndarray], List[str]]:
+    """(meta, arrays, string table) without rebuilding per-athlete dicts."""
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {k: npz[k] for k in npz.files}
+    if int(arrays["format_version"]) != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compact leaderboard format version {int(arrays['format_version'])}")
+    meta = json.loads(arrays["meta"].tobytes().decode("utf-8"))
+    strings = decode_strings(arrays["string_blob"], arrays["string_offsets"])
+    return meta, arrays, strings
+
+
+def load_npz_data(path: str) -> Dict:
+    """Rebuild the leaderboard JSON dict from a compact .npz file."""
+    meta, arrays, strings = load_npz_arrays(path)
+    events: List[str] = meta["events"]
+
+    columns = []
+    for name, kind in meta["_athlete_fields"]:
+        column = arrays[f"field_{name}"].tolist()
+        if kind == "str":
+            column = [strings[i] for i in column]
+        elif kind == "json":
+            column = [json.loads(strings[i]) for i in column]
+        columns.append((name, column))
+
+    present = arrays["present"].tolist()
+    places = arrays["places"].tolist()
+    points = arrays["points"].tolist()
+    time_idx = arrays["time_idx"].tolist()
+
+    athletes = []
+    for i in range(len(present)):
+        athlete = {name: column[i] for name, column in columns}
+        athlete["events"] = {
+            event: (
+                {
+                    "place": places[i][j],
+                    "time": strings[time_idx[i][j]] if time_idx[i][j] >= 0 else None,
+                    "points": points[i][j],
+                }
+                if present[i][j]
+                else None
+            )
+            for j, event in enumerate(events)
+        }
+        athletes.append(athlete)
+
+    rebuilt = {k: v for k, v in meta.items() if not k.startswith("_")}
+    rebuilt["athletes"] = athletes
+    if "event_point_map" in arrays:
+        rebuilt["event_point_map"] = {
+            event: {get_place_string(p): pts for p, pts in enumerate(row) if pts >= 0}
+            for event, row in zip(events, arrays["event_point_map"].tolist())
+        }
+    if "_finish_index_events" in meta:
+        places = np.where(arrays["present"], arrays["places"], 0)
+        rebuilt["event_finish_index"] = _finish_index(
+            events, meta["_finish_index_events"], places, arrays["points"], arrays["score_kind"], arrays["score_value"]
+        )
+    return {k: rebuilt[k] for k in meta["_key_order"]}
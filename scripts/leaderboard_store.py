@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Memory-mapped multi-season leaderboard store.
+
+Built from the converter's output (JSON or .npz), one directory per
+season/division holds fixed-width .npy arrays that are opened with
+mmap_mode="r", so an analysis only faults in the pages it reads and several
+processes share the same pages through the OS page cache:
+
+    <root>/index.json                 datasets, events and shapes
+    <root>/names.npy                  sorted UTF-8 athlete names (fixed width)
+    <root>/name_dataset.npy           dataset id per index entry
+    <root>/name_row.npy               row within that dataset per index entry
+    <root>/<label>/places.npy         int16/int32 [athletes x events]
+    <root>/<label>/points.npy         int16 [athletes x events]
+    <root>/<label>/raw.npy            float64 [athletes x events] parsed raw scores
+    <root>/<label>/times.npy          fixed-width UTF-8 result cells
+    <root>/<label>/has_time.npy       bool [athletes x events] (False where the cell was null)
+    <root>/<label>/names.npy          fixed-width UTF-8 names, row order
+    <root>/<label>/rank.npy           int32 published rank
+    <root>/<label>/total_points.npy   int32 published total
+    <root>/<label>/event_scales.npy   int16 [events x places] place-indexed points
+
+Looking up an athlete is a binary search over the sorted name index.
+"""
+
+import json
+import os
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from datasets import Dataset
+from leaderboard_matrix import LeaderboardMatrix
+
+
+INDEX_FILE = "index.json"
+DATASET_ARRAYS = ("places", "points", "raw", "times", "has_time", "names", "rank", "total_points", "event_scales")
+
+
+def _fixed_width(strings: Sequence[str]) -> np.ndarray:
+    encoded = [s.encode("utf-8") for s in strings]
+    width = max((len(b) for b in encoded), default=1) or 1
+    return np.array(encoded, dtype=f"S{width}")
+
+
+def _decode(value: bytes) -> str:
+    return value.decode("utf-8")
+
+
+class LeaderboardStore:
+    def __init__(self, root: str) -> None:
+        self.root = root
+        with open(os.path.join(root, INDEX_FILE), "r", encoding="utf-8") as f:
+            self.index: Dict = json.load(f)
+        self.labels: List[str] = [d["label"] for d in self.index["datasets"]]
+        self._arrays: Dict[Tuple[str, str], np.ndarray] = {}
+
+    # --------------------------
+    # Build
+    # --------------------------
+    @classmethod
+    def build(cls, root: str, datasets: Sequence[Dataset]) -> "LeaderboardStore":
+        """Write every dataset into `root` and index all athlete names."""
+        os.makedirs(root, exist_ok=True)
+        entries = []
+        index_names: List[str] = []
+        index_dataset: List[int] = []
+        index_row: List[int] = []
+
+        for dataset_id, ds in enumerate(datasets):
+            matrix = ds.matrix
+            athletes = ds.data["athletes"]
+            out_dir = os.path.join(root, ds.label)
+            os.makedirs(out_dir, exist_ok=True)
+
+            times = [t if t is not None else "" for row in matrix.times for t in row]
+            arrays = {
+                "places": matrix.places,
+                "points": matrix.points,
+                "raw": matrix.raw,
+                "times": _fixed_width(times).reshape(matrix.places.shape),
+                "has_time": np.array([[t is not None for t in row] for row in matrix.times], dtype=bool).reshape(
+                    matrix.places.shape
+                ),
+                "names": _fixed_width(matrix.names),
+                "rank": np.asarray([a.get("rank", 0) for a in athletes], dtype=np.int32),
+                "total_points": np.asarray([a.get("total_points", 0) for a in athletes], dtype=np.int32),
+                "event_scales": np.stack(matrix.event_scales),
+            }
+            for name, array in arrays.items():
+                np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(array))
+
+            entries.append(
+                {
+                    "label": ds.label,
+                    "year": ds.year or ds.data.get("year"),
+                    "division": ds.division,
+                    "events": matrix.events,
+                    "num_athletes": matrix.num_athletes,
+                    "lower_is_better": matrix.lower_is_better.tolist(),
+                }
+            )
+            index_names.extend(matrix.names)
+            index_dataset.extend([dataset_id] * matrix.num_athletes)
+            index_row.extend(range(matrix.num_athletes))
+
+        names = _fixed_width(index_names)
+        order = np.argsort(names, kind="stable")
+        np.save(os.path.join(root, "names.npy"), names[order])
+        np.save(os.path.join(root, "name_dataset.npy"), np.asarray(index_dataset, dtype=np.int16)[order])
+        np.save(os.path.join(root, "name_row.npy"), np.asarray(index_row, dtype=np.int32)[order])
+
+        with open(os.path.join(root, INDEX_FILE), "w", encoding="utf-8") as f:
+            json.dump({"datasets": entries}, f, indent=2, ensure_ascii=False)
+        return cls(root)
+
+    # --------------------------
+    # Read
+    # --------------------------
+    def _load(self, *parts: str) -> np.ndarray:
+        key = parts if len(parts) == 2 else ("", parts[0])
+        array = self._arrays.get(key)
+        if array is None:
+            array = self._arrays[key] = np.load(os.path.join(self.root, *parts) + ".npy", mmap_mode="r")
+        return array
+
+    def dataset_info(self, label: str) -> Dict:
+        return self.index["datasets"][self.labels.index(label)]
+
+    def array(self, label: str, name: str) -> np.ndarray:
+        """Read-only memory-mapped array `name` of dataset `label`."""
+        if name not in DATASET_ARRAYS:
+            raise KeyError(f"Unknown store array {name!r}")
+        return self._load(label, name)
+
+    def matrix(self, label: str) -> LeaderboardMatrix:
+        """A LeaderboardMatrix whose numeric arrays are views on the mapped files."""
+        info = self.dataset_info(label)
+        has_time = self.array(label, "has_time").tolist()
+        times = [
+            [_decode(t) if ok else None for t, ok in zip(row, present)]
+            for row, present in zip(self.array(label, "times").tolist(), has_time)
+        ]
+        scales = self.array(label, "event_scales")
+        return LeaderboardMatrix(
+            [_decode(n) for n in self.array(label, "names").tolist()],
+            info["events"],
+            self.array(label, "places"),
+            self.array(label, "points"),
+            times,
+            [{p: pts for p, pts in enumerate(row) if pts} for row in scales.tolist()],
+            raw=self.array(label, "raw"),
+            lower_is_better=np.asarray(info["lower_is_better"], dtype=bool),
+        )
+
+    def rows_for(self, name: str) -> List[Tuple[str, int]]:
+        """(dataset label, row) for every dataset the athlete appears in."""
+        names = self._load("names")
+        key = name.encode("utf-8")
+        if len(key) > names.dtype.itemsize:
+            return []
+        lo = int(np.searchsorted(names, key, side="left"))
+        hi = int(np.searchsorted(names, key, side="right"))
+        datasets = self._load("name_dataset")[lo:hi]
+        rows = self._load("name_row")[lo:hi]
+        return [(self.labels[d], int(r)) for d, r in zip(datasets.tolist(), rows.tolist())]
+
+    def athlete_history(self, name: str) -> List[Dict]:
+        """One record per season/division the athlete competed in, touching only their rows."""
+        history = []
+        for label, row in self.rows_for(name):
+            info = self.dataset_info(label)
+            places = self.array(label, "places")[row].tolist()
+            points = self.array(label, "points")[row].tolist()
+            times = self.array(label, "times")[row].tolist()
+            has_time = self.array(label, "has_time")[row].tolist()
+            history.append(
+                {
+                    "dataset": label,
+                    "year": info["year"],
+                    "division": info["division"],
+                    "rank": int(self.array(label, "rank")[row]),
+                    "total_points": int(self.array(label, "total_points")[row]),
+                    "events": {
+                        event: {"place": places[j], "time": _decode(times[j]) if has_time[j] else None, "points": points[j]}
+                        for j, event in enumerate(info["events"])
+                        if places[j]
+                    },
+                }
+            )
+        return history
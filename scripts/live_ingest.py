@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""Incremental ingest of heat results into a converted leaderboard.
+
+During a competition weekend the full CSV export only grows by one heat at a
+time. LiveLeaderboard holds the app JSON (convert_csv_to_json() output) in
+memory and applies just the new or changed result cells: each athlete's event
+result and total_points, the observed event_point_map, event_field_size, the
+official 2024 per-event maps and the finish index of each event the heat
+touched are updated in place, and ingest() returns a small diff of what moved. The work per heat depends on the heat (and on how many
+athletes it passes in the standings), never on how many events are already
+scored.
+
+Heats use the export's own layout: a CSV with a NAME column and one or more
+event columns holding cells like "8th (48:54.00) 72 pts". Blank cells are left
+alone, and so are cells that do not parse as a result (the stored result is
+kept and the cell is listed under "unparsed" in the diff); an unseen NAME adds
+an athlete and an unseen column opens an event.
+
+    python scripts/leaderboard-analysis.py ingest 2025_leaderboard_data-men.json heat-3-1.csv heat-3-2.csv
+
+rank is the standing on total_points with ties sharing a rank (1 + athletes
+strictly ahead); it is only recomputed for athletes whose standing a heat
+changed. snapshot() re-serializes only athletes with new results, so
+publishing stays cheap on large fields.
+"""
+
+import csv
+import json
+import os
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from convert_data import (
+    FinishIndexAccumulator,
+    build_event_point_map,
+    build_official_event_point_map_2024,
+    extract_athlete_info,
+    parse_event_result,
+)
+from scale_tables import get_place_string, official_scale, ordinal_map
+
+
+# Per-event maps serialized (and cached) one event at a time
+PER_EVENT_KEYS = ("event_point_map", "official_event_point_map_2024", "event_finish_index")
+
+
+# NAME-cell fields that tell athletes with the same display name apart
+IDENTITY_FIELDS = ("country", "region", "affiliate")
+
+
+def _dumps(value, indent: Optional[int] = None) -> str:
+    return json.dumps(value, indent=indent, ensure_ascii=False)
+
+
+class LiveLeaderboard:
+    """
+    data      : the app JSON document, updated in place
+    index     : athlete name -> athlete IDs (positions in data["athletes"]) with that name
+    standings : sorted (-total_points, athlete position) keys
+    seen      : per event, place -> Counter of points observed at that place
+    """
+
+    def __init__(self, data: Dict) -> None:
+        self.data = data
+        athletes = data["athletes"]
+        if "event_point_map" not in data:
+            # Older files with one shared point_system: derive the per-event maps once
+            data["event_point_map"], data["event_field_size"] = build_event_point_map(athletes, data["events"])
+            data["official_point_scales_2024"], data["official_event_point_map_2024"] = build_official_event_point_map_2024(
+                data["event_field_size"]
+            )
+
+        self.index: Dict[str, List[int]] = {}
+        for i, athlete in enumerate(athletes):
+            self.index.setdefault(athlete["name"], []).append(i)
+        self.standings: List[Tuple[float, int]] = sorted((-a.get("total_points", 0), i) for i, a in enumerate(athletes))
+
+        self.seen: Dict[str, Dict[int, Counter]] = {event: {} for event in data["events"]}
+        for athlete in athletes:
+            for event, res in (athlete.get("events") or {}).items():
+                if res and isinstance(res.get("place"), int):
+                    self.seen[event].setdefault(res["place"], Counter())[res.get("points", 0) or 0] += 1
+
+        # Events whose finish index (if the file has one) needs rebuilding after this heat
+        self._stale_index: Set[str] = set()
+
+        # Serialized athletes and per-event map blocks for snapshot(), dropped whenever they change
+        self._fragments: Dict[int, str] = {}
+        self._blocks: Dict[Tuple[str, str], str] = {}
+        self.heats = 0
+
+    @classmethod
+    def load(cls, path: str) -> "LiveLeaderboard":
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def empty(cls, year: int = 2024, gender: str = "men") -> "LiveLeaderboard":
+        # Same key order as convert_csv_to_json()
+        return cls(
+            {
+                "year": year,
+                "gender": gender,
+                "events": [],
+                "event_point_map": {},
+                "official_point_scales_2024": build_official_event_point_map_2024({})[0],
+                "official_event_point_map_2024": {},
+                "event_field_size": {},
+                "event_finish_index": {},
+                "athletes": [],
+            }
+        )
+
+    # --------------------------
+    # Standings
+    # --------------------------
+    def rank_of(self, total: float) -> int:
+        """Shared rank for `total`: one more than the athletes strictly ahead."""
+        return bisect_left(self.standings, (-total, -1)) + 1
+
+    def _move(self, i: int, old_total: float, new_total: float, touched: Set[int]) -> None:
+        """Re-key athlete `i`; everyone between its old and new total changes rank."""
+        del self.standings[bisect_left(self.standings, (-old_total, i))]
+        insort(self.standings, (-new_total, i))
+        low, high = sorted((old_total, new_total))
+        # Athletes with totals in [low, high] gain or lose exactly this athlete ahead of them
+        start = bisect_left(self.standings, (-high, -1))
+        stop = bisect_right(self.standings, (-low, len(self.data["athletes"])))
+        touched.update(j for _, j in self.standings[start:stop])
+
+    # --------------------------
+    # Events and point maps
+    # --------------------------
+    def open_event(self, event: str) -> None:
+        """Start a new event column: every athlete gets an empty result."""
+        self.data["events"].append(event)
+        self.data["event_point_map"][event] = {}
+        self.data["event_field_size"][event] = 0
+        self.data["official_event_point_map_2024"][event] = ordinal_map(official_scale(2024, 0))
+        self.seen[event] = {}
+        if "event_finish_index" in self.data:
+            self._stale_index.add(event)
+        for i, athlete in enumerate(self.data["athletes"]):
+            athlete["events"][event] = None
+            self._fragments.pop(i, None)
+
+    def _observe(self, event: str, place: int, points: int, delta: int, diff: Dict) -> None:
+        """Add (delta=1) or remove (delta=-1) one observed (place, points) and refresh the maps."""
+        seen = self.seen[event]
+        counter = seen.setdefault(place, Counter())
+        counter[points] += delta
+        if counter[points] <= 0:
+            del counter[points]
+        if not counter:
+            del seen[place]
+
+        # Highest points seen for a place, like build_event_point_map()
+        point_map = self.data["event_point_map"][event]
+        key = get_place_string(place)
+        best = max(counter) if counter else None
+        if point_map.get(key) != best:
+            if best is None:
+                del point_map[key]
+            else:
+                point_map[key] = best
+            diff["event_point_map"].setdefault(event, {})[key] = best
+            self._blocks.pop(("event_point_map", event), None)
+
+        # Field size is the highest place observed
+        field_size = self.data["event_field_size"][event]
+        if delta > 0 and place > field_size:
+            field_size = place
+        elif delta < 0 and place == field_size and place not in seen:
+            field_size = max(seen, default=0)
+        if field_size != self.data["event_field_size"][event]:
+            self.data["event_field_size"][event] = field_size
+            official = ordinal_map(official_scale(2024, field_size))
+            self.data["official_event_point_map_2024"][event] = official
+            diff["event_field_size"][event] = field_size
+            diff["official_event_point_map_2024"][event] = official
+            self._blocks.pop(("official_event_point_map_2024", event), None)
+
+    def _rebuild_index(self, event: str) -> None:
+        """Re-sort one event's finish index (the other events are untouched)."""
+        accumulator = FinishIndexAccumulator([event])
+        accumulator.num_athletes = len(self.data["athletes"])
+        for i, athlete in enumerate(self.data["athletes"]):
+            accumulator.add_result(i, event, athlete["events"].get(event))
+        self.data["event_finish_index"][event] = accumulator.event_index(event)
+        self._blocks.pop(("event_finish_index", event), None)
+
+    # --------------------------
+    # Ingest
+    # --------------------------
+    def _athlete(self, name_cell: str, diff: Dict, touched: Set[int]) -> int:
+        info = extract_athlete_info(name_cell)
+        candidates = self.index.get(info["name"], [])
+        # Athletes sharing a name are told apart by the profile lines of the NAME cell
+        profile = [key for key in IDENTITY_FIELDS if info[key]]
+        if profile:
+            athletes = self.data["athletes"]
+            candidates = [i for i in candidates if all(athletes[i].get(key) == info[key] for key in profile)]
+        if len(candidates) == 1:
+            return candidates[0]
+        if candidates:
+            raise ValueError(f"{len(candidates)} athletes are named {info['name']!r}; include their profile lines in NAME")
+        i = len(self.data["athletes"])
+        athlete = {"rank": 0, **info, "total_points": 0, "events": {event: None for event in self.data["events"]}}
+        self.data["athletes"].append(athlete)
+        self.index.setdefault(athlete["name"], []).append(i)
+        insort(self.standings, (0, i))
+        touched.add(i)
+        # Every event's per-athlete positions grow by one (no place yet)
+        for event, entry in self.data.get("event_finish_index", {}).items():
+            entry["position"].append(-1)
+            self._blocks.pop(("event_finish_index", event), None)
+        diff["new_athletes"].append({"id": i, "name": athlete["name"]})
+        return i
+
+    def update_result(self, i: int, event: str, result: Optional[Dict], diff: Dict, touched: Set[int]) -> None:
+        """Set athlete `i`'s result for `event` (None clears it) and carry the points into its total."""
+        athlete = self.data["athletes"][i]
+        previous = athlete["events"].get(event)
+        if previous == result:
+            return
+        for res, delta in ((previous, -1), (result, 1)):
+            if res and isinstance(res.get("place"), int):
+                self._observe(event, res["place"], res.get("points", 0) or 0, delta, diff)
+        athlete["events"][event] = result
+        self._fragments.pop(i, None)
+        if "event_finish_index" in self.data:
+            self._stale_index.add(event)
+        diff["results"].append({"id": i, "name": athlete["name"], "event": event, "result": result, "previous": previous})
+
+        change = ((result or {}).get("points", 0) or 0) - ((previous or {}).get("points", 0) or 0)
+        if change:
+            old_total = athlete["total_points"]
+            diff["totals"].setdefault(i, [old_total, None])
+            athlete["total_points"] = old_total + change
+            diff["totals"][i][1] = athlete["total_points"]
+            self._move(i, old_total, athlete["total_points"], touched)
+
+    def ingest(self, rows: Iterable[Dict[str, str]]) -> Dict:
+        """
+        Apply one heat given as CSV-style rows (NAME plus event columns) and
+        return its diff: changed results, totals, ranks and point-map entries,
+        plus the non-blank cells that did not parse (their results are kept).
+        """
+        self.heats += 1
+        diff: Dict = {
+            "heat": self.heats,
+            "new_events": [],
+            "new_athletes": [],
+            "results": [],
+            "unparsed": [],
+            "totals": {},
+            "ranks": [],
+            "event_point_map": {},
+            "event_field_size": {},
+            "official_event_point_map_2024": {},
+        }
+        touched: Set[int] = set()
+        core = {"RANK", "NAME", "POINTS"}
+        for row in rows:
+            i = self._athlete(row["NAME"], diff, touched)
+            for column, cell in row.items():
+                if not column or column.strip().upper() in core or not (cell or "").strip():
+                    continue
+                event = column.strip()
+                if event not in self.seen:
+                    self.open_event(event)
+                    diff["new_events"].append(event)
+                result = parse_event_result(cell)
+                if result is None:
+                    name = self.data["athletes"][i]["name"]
+                    diff["unparsed"].append({"id": i, "name": name, "event": event, "cell": cell})
+                    continue
+                self.update_result(i, event, result, diff, touched)
+
+        for event in self._stale_index:
+            self._rebuild_index(event)
+        self._stale_index.clear()
+
+        for i in sorted(touched):
+            athlete = self.data["athletes"][i]
+            rank = self.rank_of(athlete["total_points"])
+            if rank != athlete["rank"]:
+                diff["ranks"].append({"id": i, "name": athlete["name"], "rank": rank, "previous_rank": athlete["rank"]})
+                athlete["rank"] = rank
+
+        athletes = self.data["athletes"]
+        diff["totals"] = [
+            {"id": i, "name": athletes[i]["name"], "total_points": new, "previous_total_points": old}
+            for i, (old, new) in diff["totals"].items()
+        ]
+        return diff
+
+    def ingest_csv(self, path: str) -> Dict:
+        with open(path, "r", encoding="utf-8") as f:
+            return self.ingest(csv.DictReader(f))
+
+    # --------------------------
+    # Snapshot
+    # --------------------------
+    def _dump_events(self, key: str) -> str:
+        """A per-event entry (event_point_map...) at document level, one cached block per event."""
+        blocks = []
+        for event, value in self.data[key].items():
+            block = self._blocks.get((key, event))
+            if block is None and key == "event_finish_index":
+                block = f"    {_dumps(event)}: " + _dumps(value, indent=2).replace("\n", "\n    ")
+                self._blocks[(key, event)] = block
+            elif block is None:
+                # Flat ordinal -> integer points maps: written directly, as json.dump(indent=2) would
+                items = ",\n".join(f"      {encode_basestring(place)}: {pts}" for place, pts in value.items())
+                block = f"    {_dumps(event)}: " + ("{\n" + items + "\n    }" if items else "{}")
+                self._blocks[(key, event)] = block
+            blocks.append(block)
+        return "{\n" + ",\n".join(blocks) + "\n  }" if blocks else "{}"
+
+    def snapshot(self) -> str:
+        """The document as convert_csv_to_json() writes it (indent=2), re-serializing only what changed."""
+        parts = []
+        for key, value in self.data.items():
+            if key == "athletes":
+                fragments = []
+                for i, athlete in enumerate(value):
+                    # Cached without the leading "rank" key, which is all most heats change
+                    rest = self._fragments.get(i)
+                    if rest is None:
+                        body = {k: v for k, v in athlete.items() if k != "rank"}
+                        rest = self._fragments[i] = _dumps(body, indent=2).replace("\n", "\n    ")[1:]
+                    rank = athlete["rank"]
+                    rank = rank if type(rank) is int else _dumps(rank)
+                    fragments.append(f'    {{\n      "rank": {rank},{rest}')
+                text = "[\n" + ",\n".join(fragments) + "\n  ]" if fragments else "[]"
+            elif key in PER_EVENT_KEYS:
+                text = self._dump_events(key)
+            else:
+                text = _dumps(value, indent=2).replace("\n", "\n  ")
+            parts.append(f"  {_dumps(key)}: {text}")
+        return "{\n" + ",\n".join(parts) + "\n}"
+
+    def write_snapshot(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.snapshot())
+
+
+def ingest_heats(snapshot_path: str, heat_paths: List[str], diff_path: Optional[str] = None, year: int = 2024, gender: str = "men") -> List[Dict]:
+    """
+    Apply heat CSVs in order to the snapshot at `snapshot_path` (started empty
+    if missing), rewriting it and appending one diff line per heat to
+    `diff_path` (default <snapshot>.diff.jsonl) after every heat.
+    """
+    board = LiveLeaderboard.load(snapshot_path) if os.path.exists(snapshot_path) else LiveLeaderboard.empty(year, gender)
+    diff_path = diff_path or os.path.splitext(snapshot_path)[0] + ".diff.jsonl"
+    diffs = []
+    with open(diff_path, "a", encoding="utf-8") as out:
+        for path in heat_paths:
+            diff = board.ingest_csv(path)
+            diff["source"] = path
+            out.write(json.dumps(diff, ensure_ascii=False) + "\n")
+            out.flush()
+            board.write_snapshot(snapshot_path)
+            diffs.append(diff)
+            print(
+                f"{path}: {len(diff['results'])} results, {len(diff['totals'])} totals, "
+                f"{len(diff['ranks'])} ranks changed"
+                + (f", {len(diff['unparsed'])} unparsed cells kept" if diff["unparsed"] else "")
+            )
+    print(f"Snapshot saved to {snapshot_path}, diffs appended to {diff_path}")
+    return diffs
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Monte Carlo leaderboard robustness: rank distributions under noisy results.
+
+The fragility index only looks at deterministic ±1 place swaps. Here every
+parseable raw score (parse_raw_score() reading) gets relative Gaussian noise,
+each event is re-placed from the noisy scores, the field is rescored with any
+registered scoring method and ranked. Thousands of simulated leaderboards are handled
+per NumPy call as [sims x athletes x events] arrays.
+
+Simulations are cut into fixed-size chunks, and each chunk draws from its own
+stream spawned from one SeedSequence. Results depend only on (seed, sims,
+chunk size) and reproduce exactly whatever the number of workers or the order
+chunks finish in.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from leaderboard_matrix import LeaderboardMatrix
+from scoring import batch_points
+
+
+# parse_raw_score() reads CAP+n as CAP_OFFSET + n, sorting after every time
+CAP_OFFSET = 1e6
+
+
+# --------------------------
+# Vectorized simulation
+# --------------------------
+def noisy_raw(raw: np.ndarray, sigma: float, rng: np.random.Generator, sims: int) -> np.ndarray:
+    """
+    [sims x athletes x events] copies of `raw` with relative noise N(0, sigma).
+    For CAP+n results only the reps over the cap are perturbed, so capped
+    athletes stay behind every finisher.
+    """
+    base = np.where(raw >= CAP_OFFSET, CAP_OFFSET, 0.0)
+    z = rng.standard_normal((sims,) + raw.shape)
+    return base + (raw - base) * (1 + sigma * z)
+
+
+def replace_events(raw: np.ndarray, lower_is_better: np.ndarray, places: np.ndarray) -> np.ndarray:
+    """
+    Re-place every event of a [sims x athletes x events] score batch, 1 = best.
+    Equal scores keep the source leaderboard's tie-break: they are ordered by
+    their original places and share a place (the next one skipping, 1, 2, 2, 4)
+    only where those were shared too. Results without a score (NaN) go after
+    every scored one in their original finish order.
+    """
+    sims, n, num_events = raw.shape
+    key = np.where(lower_is_better, raw, -raw)
+    key = np.where(np.isnan(key), np.inf, key)
+
+    # Sort by original place first so the stable sort on the key keeps it as the tie-break
+    by_place = np.broadcast_to(np.argsort(places, axis=0, kind="stable"), key.shape)
+    key = np.take_along_axis(key, by_place, axis=1)
+    sort = np.argsort(key, axis=1, kind="stable")
+    order = np.take_along_axis(by_place, sort, axis=1)
+    ranked = np.take_along_axis(key, sort, axis=1)
+    was = np.take_along_axis(np.broadcast_to(places, order.shape), order, axis=1)
+
+    # A new place starts wherever the score or the original place changes;
+    # missing results never tie
+    starts = np.ones(ranked.shape, dtype=bool)
+    starts[:, 1:] = (ranked[:, 1:] != ranked[:, :-1]) | (was[:, 1:] != was[:, :-1]) | np.isinf(ranked[:, 1:])
+    position = np.arange(1, n + 1)[None, :, None]
+    ranks = np.maximum.accumulate(np.where(starts, position, 0), axis=1)
+
+    new_places = np.empty((sims, n, num_events), dtype=np.int64)
+    np.put_along_axis(new_places, order, ranks, axis=1)
+    return new_places
+
+
+def batch_ranks(totals: np.ndarray, name_rank: np.ndarray) -> np.ndarray:
+    """1-based ranks of a [sims x athletes] totals batch, ties broken like compute_leaderboard()."""
+    order = np.lexsort((np.broadcast_to(name_rank, totals.shape), -totals), axis=-1)
+    ranks = np.empty(totals.shape, dtype=np.int64)
+    np.put_along_axis(ranks, order, np.arange(1, totals.shape[-1] + 1)[None, :], axis=-1)
+    return ranks
+
+
+def simulate_ranks(
+    matrix: LeaderboardMatrix,
+    sims: int,
+    rng: np.random.Generator,
+    sigma: float = 0.02,
+    method: str = "official",
+    k: float = 0.5,
+) -> np.ndarray:
+    """[sims x athletes] ranks of `sims` noisy leaderboards scored with `method`."""
+    raw = noisy_raw(matrix.raw, sigma, rng, sims)
+    places = replace_events(raw, matrix.lower_is_better, matrix.places)
+    points = batch_points(matrix, method, k=k, places=places, raw=raw)
+    n, num_events = matrix.num_athletes, matrix.num_events
+
+    # Column by column so float totals match a left-to-right sum
+    totals = np.zeros((sims, n), dtype=np.float64 if points.dtype.kind == "f" else np.int64)
+    for j in range(num_events):
+        totals += points[:, :, j]
+    return batch_ranks(totals, matrix._name_rank)
+
+
+def rank_histogram(ranks: np.ndarray) -> np.ndarray:
+    """int64 [athletes x ranks] count of simulations each athlete finished at each rank."""
+    sims, n = ranks.shape
+    flat = np.arange(n)[None, :] * n + (ranks - 1)
+    return np.bincount(flat.ravel(), minlength=n * n).reshape(n, n)
+
+
+# --------------------------
+# Chunked, seeded runs
+# --------------------------
+# Worker-side read-only dataset, set once per process by _init_worker()
+_MATRIX: Optional[LeaderboardMatrix] = None
+
+
+def _init_worker(matrix: LeaderboardMatrix) -> None:
+    global _MATRIX
+    _MATRIX = matrix
+
+
+def _run_chunk(job: Tuple[np.random.SeedSequence, int, float, str, float, int]) -> np.ndarray:
+    seed_seq, sims, sigma, method, k, batch_size = job
+    return _simulate_chunk(_MATRIX, seed_seq, sims, sigma, method, k, batch_size)
+
+
+def _simulate_chunk(matrix, seed_seq, sims, sigma, method, k, batch_size) -> np.ndarray:
+    rng = np.random.default_rng(seed_seq)
+    counts = np.zeros((matrix.num_athletes, matrix.num_athletes), dtype=np.int64)
+    for start in range(0, sims, batch_size):
+        size = min(batch_size, sims - start)
+        counts += rank_histogram(simulate_ranks(matrix, size, rng, sigma, method, k))
+    return counts
+
+
+def simulate(
+    matrix: LeaderboardMatrix,
+    sims: int = 10000,
+    sigma: float = 0.02,
+    method: str = "official",
+    k: float = 0.5,
+    seed: int = 0,
+    workers: int = 1,
+    chunk_size: int = 20000,
+    batch_size: int = 2000,
+) -> np.ndarray:
+    """
+    Rank histogram (see rank_histogram()) over `sims` noisy leaderboards.
+    Chunks of `chunk_size` simulations each get their own child of
+    SeedSequence(seed) and are spread over `workers` processes.
+    """
+    for name, value in (("sims", sims), ("chunk_size", chunk_size), ("batch_size", batch_size)):
+        if value < 1:
+            raise ValueError(f"{name} must be a positive integer, got {value}")
+    sizes = [min(chunk_size, sims - start) for start in range(0, sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    counts = np.zeros((matrix.num_athletes, matrix.num_athletes), dtype=np.int64)
+
+    if workers <= 1:
+        for seed_seq, size in zip(seeds, sizes):
+            counts += _simulate_chunk(matrix, seed_seq, size, sigma, method, k, batch_size)
+        return counts
+
+    jobs = [(seed_seq, size, sigma, method, k, batch_size) for seed_seq, size in zip(seeds, sizes)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(matrix,)) as pool:
+        for chunk in pool.map(_run_chunk, jobs):
+            counts += chunk
+    return counts
+
+
+def summarize(matrix: LeaderboardMatrix, counts: np.ndarray, method: str = "official", k: float = 0.5) -> List[Dict]:
+    """Per-athlete rank distribution summary, in current leaderboard order."""
+    ranks, order, _ = matrix.compute_leaderboard(batch_points(matrix, method, k=k))
+    sims = counts[0].sum()
+    rank_values = np.arange(1, matrix.num_athletes + 1)
+    mean = counts @ rank_values / sims
+    std = np.sqrt(np.maximum(counts @ rank_values ** 2 / sims - mean ** 2, 0))
+
+    rows = []
+    for a in order.tolist():
+        rows.append(
+            {
+                "name": matrix.names[a],
+                "rank": int(ranks[a]),
+                "mean_rank": round(float(mean[a]), 4),
+                "rank_std": round(float(std[a]), 4),
+                "p_win": round(float(counts[a, 0] / sims), 6),
+                "p_podium": round(float(counts[a, :3].sum() / sims), 6),
+                "p_top10": round(float(counts[a, :10].sum() / sims), 6),
+                "rank_counts": counts[a].tolist(),
+            }
+        )
+    return rows
+
+
+def report(
+    matrix: LeaderboardMatrix,
+    suffix: str = "",
+    results_dir: str = "results",
+    sims: int = 10000,
+    sigma: float = 0.02,
+    method: str = "official",
+    k: float = 0.5,
+    seed: int = 0,
+    workers: int = 1,
+    chunk_size: int = 20000,
+    batch_size: int = 2000,
+) -> None:
+    """Run the simulation, print the podium contenders and save results/monte_carlo{suffix}.json."""
+    counts = simulate(matrix, sims, sigma, method, k, seed, workers, chunk_size, batch_size)
+    rows = summarize(matrix, counts, method, k)
+
+    print(f"{sims} simulations, sigma={sigma}, method={method}, seed={seed}")
+    print(f"{'Rank':>4}  {'Athlete':<28} {'MeanRank':>8} {'P(win)':>8} {'P(podium)':>9} {'P(top10)':>8}")
+    for row in rows:
+        if row["p_podium"] == 0 and row["rank"] > 10:
+            continue
+        print(
+            f"{row['rank']:>4}  {row['name']:<28} {row['mean_rank']:>8.2f} "
+            f"{row['p_win']:>8.4f} {row['p_podium']:>9.4f} {row['p_top10']:>8.4f}"
+        )
+
+    Path(results_dir).mkdir(exist_ok=True)
+    params = {"sims": sims, "sigma": sigma, "method": method, "k": k, "seed": seed, "chunk_size": chunk_size}
+    with open(f"{results_dir}/monte_carlo{suffix}.json", "w") as f:
+        json.dump({"params": params, "athletes": rows}, f, indent=2)
@@ -13,6 +13,10 @@ women_decay = women_df[women_df["method"].str.startswith("decay_k")].copy()
 men_decay["k"] = men_decay["method"].str.replace("decay_k=", "").astype(float)
 women_decay["k"] = women_decay["method"].str.replace("decay_k=", "").astype(float)
 
+# Parallel sweeps write rows in completion order
+men_decay = men_decay.sort_values("k")
+women_decay = women_decay.sort_values("k")
+
 # --- Plot Fragility Index ---
 plt.figure(figsize=(8, 5))
 plt.plot(men_decay["k"], men_decay["FI"], marker="o", label="Men (decay)")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Opt-in stage timers and counters for the analysis hot paths.
+
+Profiling is off unless enable() is called (the --profile flags) or the
+LEADERBOARD_PROFILE environment variable is set: "1" for timers plus
+tracemalloc allocation tracking, "time" for timers only. While off, stage()
+hands back one shared no-op context and count() returns at once.
+
+Each stage records its call count, cumulative wall time and, with memory
+tracking, the net bytes it left allocated and its peak allocation above
+the level it started at. Nested stages are fine; an inner peak counts
+towards its outer stage too.
+
+    with profiling.stage("analyze.score"):
+        points = batch_points(matrix, method)
+    profiling.count("swap_scan.swaps", n)
+"""
+
+import contextlib
+import json
+import os
+import time
+import tracemalloc
+from typing import Dict, Iterator, List, Optional
+
+
+_enabled = False
+_memory = False
+_stages: Dict[str, Dict[str, float]] = {}
+_counters: Dict[str, int] = {}
+# Running peak per open stage, innermost last
+_peaks: List[List[int]] = []
+
+
+def enable(memory: bool = True) -> None:
+    global _enabled, _memory
+    _enabled = True
+    _memory = memory
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def memory_enabled() -> bool:
+    return _memory
+
+
+def reset() -> None:
+    _stages.clear()
+    _counters.clear()
+
+
+def count(name: str, n: int = 1) -> None:
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+@contextlib.contextmanager
+def _timed_stage(name: str) -> Iterator[None]:
+    if _memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if _peaks:
+            _peaks[-1][1] = max(_peaks[-1][1], peak)
+        tracemalloc.reset_peak()
+        _peaks.append([current, current])
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        entry = _stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+        entry["calls"] += 1
+        entry["seconds"] += elapsed
+        if _memory:
+            current, peak = tracemalloc.get_traced_memory()
+            start_bytes, running_peak = _peaks.pop()
+            peak = max(peak, running_peak)
+            entry["alloc_bytes"] = entry.get("alloc_bytes", 0) + current - start_bytes
+            entry["peak_bytes"] = max(entry.get("peak_bytes", 0), peak - start_bytes)
+            if _peaks:
+                _peaks[-1][1] = max(_peaks[-1][1], peak)
+            tracemalloc.reset_peak()
+
+
+_DISABLED = contextlib.nullcontext()
+
+
+def stage(name: str):
+    """Context manager timing one pass through stage `name` (no-op while profiling is off)."""
+    return _timed_stage(name) if _enabled else _DISABLED
+
+
+def summary() -> Dict:
+    """Stages sorted by cumulative time, plus counters."""
+    stages = {
+        name: {**entry, "seconds": round(entry["seconds"], 6), "mean_seconds": round(entry["seconds"] / entry["calls"], 6)}
+        for name, entry in sorted(_stages.items(), key=lambda item: -item[1]["seconds"])
+    }
+    return {"memory": _memory, "stages": stages, "counters": dict(sorted(_counters.items()))}
+
+
+def merge(other: Dict) -> None:
+    """Fold a summary() from another process (e.g. a pool worker) into this one."""
+    for name, entry in other.get("stages", {}).items():
+        mine = _stages.setdefault(name, {"calls": 0, "seconds": 0.0})
+        mine["calls"] += entry["calls"]
+        mine["seconds"] += entry["seconds"]
+        if "alloc_bytes" in entry:
+            mine["alloc_bytes"] = mine.get("alloc_bytes", 0) + entry["alloc_bytes"]
+            mine["peak_bytes"] = max(mine.get("peak_bytes", 0), entry["peak_bytes"])
+    for name, n in other.get("counters", {}).items():
+        _counters[name] = _counters.get(name, 0) + n
+
+
+def write_summary(path: str, extra: Optional[Dict] = None) -> None:
+    """Write summary() (and any `extra` run details) as JSON if profiling is on."""
+    if not _enabled:
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**(extra or {}), **summary()}, f, indent=2)
+    print(f"Profile saved to {path}")
+
+
+_env = os.environ.get("LEADERBOARD_PROFILE", "").strip().lower()
+if _env and _env not in ("0", "false", "no"):
+    enable(memory=_env != "time")
@@ -1,139 +1,184 @@
 #!/usr/bin/env python3
 import json
-import copy
-from collections import defaultdict
+from array import array
 from pathlib import Path
 
-# --------------------------
-# Load dataset
-# --------------------------
-with open("crossfit-leaderboard-remix/public/leaderboard_data-men.json", "r") as f:
-    data = json.load(f)
+import numpy as np
 
-events = data["events"]
-point_system = {int(k.rstrip("stndrh")): v for k, v in data["point_system"].items()}
-athletes = data["athletes"]
+import profiling
+from leaderboard_matrix import LeaderboardMatrix
+from ripple_engine import RippleEngine
+
+DATASET = "crossfit-leaderboard-remix/public/leaderboard_data-men.json"
 
-# --------------------------
-# Helper: compute leaderboard given athlete data
-# --------------------------
-def compute_leaderboard(athletes):
-    leaderboard = []
-    for a in athletes:
-        total = sum(ev["points"] for ev in a["events"].values())
-        leaderboard.append((a["name"], total))
-    leaderboard.sort(key=lambda x: (-x[1], x[0]))
-    ranks = {name: i + 1 for i, (name, _) in enumerate(leaderboard)}
-    return ranks, leaderboard
 
 # --------------------------
-# Helper: apply perturbation
+# Main analysis
 # --------------------------
-def perturb(athletes, athlete_name, event_name, direction):
-    """
-    direction = +1 (improve by one place) or -1 (worsen by one place)
-    """
-    athletes_copy = copy.deepcopy(athletes)
-    # Extract current placements in this event
-    placements = [(a["name"], a["events"][event_name]["place"]) for a in athletes_copy]
-    placements.sort(key=lambda x: x[1])
-    idx = [name for name, _ in placements].index(athlete_name)
-
-    # Cannot move outside bounds
-    if direction == -1 and idx == len(placements) - 1:
-        return None
-    if direction == +1 and idx == 0:
+def iter_displacements(matrix):
+    """Yield one displacement record per JME as the scan finds it."""
+    engine = RippleEngine.from_matrix(matrix)
+    for a, e, direction, changes in engine.jme_scan():
+        changed = [(engine.names[other], old, new) for other, old, new in changes]
+        yield {
+            "athlete": engine.names[a],
+            "event": matrix.events[e],
+            "direction": "improve" if direction == +1 else "worsen",
+            "ripple_count": len(changed),
+            "changes": changed
+        }
+
+
+def jme_displacements(matrix):
+    return list(iter_displacements(matrix))
+
+
+def top10_record(d):
+    """The record with its top-10 changes added, or None if the ripple never reaches the top 10."""
+    top10_changes = [
+        (name, old, new)
+        for name, old, new in d["changes"]
+        if old <= 10 or new <= 10
+    ]
+    if not top10_changes:
         return None
+    return {
+        **d,
+        "top10_changes": top10_changes,
+        "top10_ripple_count": len(top10_changes)
+    }
 
-    swap_idx = idx - direction  # note: improve = -1 index shift
-    athlete_swap = placements[swap_idx][0]
 
-    # Swap placements
-    for a in athletes_copy:
-        if a["name"] == athlete_name:
-            a["events"][event_name]["place"] += -direction
-            a["events"][event_name]["points"] = point_system[a["events"][event_name]["place"]]
-        if a["name"] == athlete_swap:
-            a["events"][event_name]["place"] += direction
-            a["events"][event_name]["points"] = point_system[a["events"][event_name]["place"]]
-    return athletes_copy
+def top10_filter(displacements):
+    return [t for t in map(top10_record, displacements) if t is not None]
 
-# --------------------------
-# Main analysis
-# --------------------------
-original_ranks, original_lb = compute_leaderboard(athletes)
-displacements = []
-
-for athlete in athletes:
-    for event in events:
-        for direction in [+1, -1]:
-            perturbed = perturb(athletes, athlete["name"], event, direction)
-            if perturbed is None:
-                continue
-
-            new_ranks, _ = compute_leaderboard(perturbed)
-            self_rank_change = new_ranks[athlete["name"]] - original_ranks[athlete["name"]]
-
-            # Check for JME condition
-            if self_rank_change == 0:
-                changed = [
-                    (name, original_ranks[name], new_ranks[name])
-                    for name in original_ranks
-                    if original_ranks[name] != new_ranks[name]
-                ]
-                if changed:
-                    displacements.append({
-                        "athlete": athlete["name"],
-                        "event": event,
-                        "direction": "improve" if direction == +1 else "worsen",
-                        "ripple_count": len(changed),
-                        "changes": changed
-                    })
 
 # --------------------------
 # Results
 # --------------------------
-print(f"Total JME displacements detected: {len(displacements)}")
-for d in displacements[:10]:  # show a sample
-    print(
-        f"{d['athlete']} ({d['direction']} in {d['event']}): "
-        f"rippled {d['ripple_count']} athletes -> {d['changes'][:3]}..."
-    )
+def report(matrix, suffix="", results_dir="results"):
+    """
+    Run the JME scan, print a sample and save results/jme_*displacements{suffix}.json
+    (plus jme_displacements{suffix}.profile.json when profiling).
+    """
+    profiling.reset()
+    with profiling.stage("ripple.jme_scan"):
+        displacements = jme_displacements(matrix)
+    profiling.count("ripple.jme", len(displacements))
+
+    print(f"Total JME displacements detected: {len(displacements)}")
+    for d in displacements[:10]:  # show a sample
+        print(
+            f"{d['athlete']} ({d['direction']} in {d['event']}): "
+            f"rippled {d['ripple_count']} athletes -> {d['changes'][:3]}..."
+        )
+
+    # Save full results
+    Path(results_dir).mkdir(exist_ok=True)
+    with profiling.stage("ripple.write"), open(f"{results_dir}/jme_displacements{suffix}.json", "w") as f:
+        json.dump(displacements, f, indent=2)
+
+    with profiling.stage("ripple.top10_filter"):
+        top10_displacements = top10_filter(displacements)
+
+    print(f"Total JME displacements: {len(displacements)}")
+    print(f"Top 10 ripple effects: {len(top10_displacements)}")
+
+    # Show a few examples
+    for d in top10_displacements:
+        print(
+            f"{d['athlete']} ({d['direction']} in {d['event']}): "
+            f"TOP-10 ripple {d['top10_ripple_count']} athletes -> {d['top10_changes'][:3]}..."
+        )
+
+    # Save both
+    with profiling.stage("ripple.write"), open(f"{results_dir}/jme_top10_displacements{suffix}.json", "w") as f:
+        json.dump(top10_displacements, f, indent=2)
+
+    profiling.write_summary(f"{results_dir}/jme_displacements{suffix}.profile.json", {"athletes": matrix.num_athletes, "events": matrix.num_events})
+
+
+def stream_report(matrix, suffix="", results_dir="results"):
+    """
+    Like report(), but every record is written to results/jme_*displacements{suffix}.jsonl
+    (one JSON object per line) as the scan finds it, top-10 records are filtered
+    in the same pass and the totals are running counters, so memory stays flat
+    however many ripples there are.
+    """
+    profiling.reset()
+    Path(results_dir).mkdir(exist_ok=True)
+    total = top10_total = changes_total = 0
+
+    with open(f"{results_dir}/jme_displacements{suffix}.jsonl", "w") as out, \
+            open(f"{results_dir}/jme_top10_displacements{suffix}.jsonl", "w") as top10_out:
+        with profiling.stage("ripple.jme_scan"):
+            for d in iter_displacements(matrix):
+                total += 1
+                changes_total += d["ripple_count"]
+                if total <= 10:  # show a sample
+                    print(
+                        f"{d['athlete']} ({d['direction']} in {d['event']}): "
+                        f"rippled {d['ripple_count']} athletes -> {d['changes'][:3]}..."
+                    )
+                out.write(json.dumps(d) + "\n")
+
+                t = top10_record(d)
+                if t is not None:
+                    top10_total += 1
+                    top10_out.write(json.dumps(t) + "\n")
+
+    profiling.count("ripple.jme", total)
+    print(f"Total JME displacements: {total}")
+    print(f"Athletes displaced across all JMEs: {changes_total}")
+    print(f"Top 10 ripple effects: {top10_total}")
+    profiling.write_summary(f"{results_dir}/jme_displacements{suffix}.profile.json", {"athletes": matrix.num_athletes, "events": matrix.num_events})
 
-# Save full results
-Path("results").mkdir(exist_ok=True)
-with open("results/jme_displacements.json", "w") as f:
-    json.dump(displacements, f, indent=2)
 
 # --------------------------
-# Results: filter for Top 10 ripples
+# Multi-place moves
 # --------------------------
-top10_displacements = []
-for d in displacements:
-    top10_changes = [
-        (name, old, new)
-        for name, old, new in d["changes"]
-        if old <= 10 or new <= 10
-    ]
-    if top10_changes:
-        top10_displacements.append({
-            **d,
-            "top10_changes": top10_changes,
-            "top10_ripple_count": len(top10_changes)
-        })
-
-print(f"Total JME displacements: {len(displacements)}")
-print(f"Top 10 ripple effects: {len(top10_displacements)}")
-
-# Show a few examples
-for d in top10_displacements:
-    print(
-        f"{d['athlete']} ({d['direction']} in {d['event']}): "
-        f"TOP-10 ripple {d['top10_ripple_count']} athletes -> {d['top10_changes'][:3]}..."
+def move_report(matrix, suffix="", results_dir="results"):
+    """
+    Move every athlete to every finish position of every event, print a summary
+    and save the rank changes to results/move_displacements{suffix}.npz as
+    sparse columns: one (athlete, event, position, other, delta) record per
+    athlete whose rank changes (delta = new - old) in a move.
+    """
+    engine = RippleEngine.from_matrix(matrix)
+    columns = {name: array("i") for name in ("athlete", "event", "position", "other", "delta")}
+    scenarios = changed = jme = top10 = 0
+    for a, e, position, changes in engine.move_scan():
+        scenarios += 1
+        if not changes:
+            continue
+        changed += 1
+        # A move is a JME when the mover keeps their rank but somebody else's changes
+        jme += all(other != a for other, _, _ in changes)
+        top10 += any(old <= 10 or new <= 10 for _, old, new in changes)
+        for other, old, new in changes:
+            columns["athlete"].append(a)
+            columns["event"].append(e)
+            columns["position"].append(position)
+            columns["other"].append(other)
+            columns["delta"].append(new - old)
+
+    print(f"Multi-place moves: {scenarios} scenarios")
+    print(f"Moves that change anyone's rank: {changed}")
+    print(f"JME moves (mover's rank unchanged): {jme}")
+    print(f"Moves that change the top 10: {top10}")
+
+    ranks, _, _ = matrix.compute_leaderboard()
+    finish_places = np.sort(matrix.places, axis=0).T
+    Path(results_dir).mkdir(exist_ok=True)
+    np.savez_compressed(
+        f"{results_dir}/move_displacements{suffix}.npz",
+        **{name: np.frombuffer(column, dtype=np.int32) for name, column in columns.items()},
+        names=np.array(matrix.names),
+        events=np.array(matrix.events),
+        finish_places=finish_places,
+        ranks=ranks,
     )
 
-# Save both
-with open("results/jme_top10_displacements.json", "w") as f:
-    json.dump(top10_displacements, f, indent=2)
-
 
+if __name__ == "__main__":
+    report(LeaderboardMatrix.load(DATASET))
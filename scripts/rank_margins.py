@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""Closed-form rank sensitivity from the sorted totals.
+
+Once the leaderboard is sorted, each athlete's margin to the ranks directly
+above and below says how many points it takes to move, and the new rank of any
+athlete whose total changes is a binary search over the unchanged keys. A ±1
+place swap only changes two totals, so whether it moves anybody, and who, is
+decided by margin checks instead of re-sorting or simulating the field.
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import profiling
+from leaderboard_matrix import LeaderboardMatrix
+
+
+class RankMargins:
+    """
+    order       : athlete rows in leaderboard order (points desc, then name, then row)
+    pos         : 0-based leaderboard position of each row
+    totals      : total points per row
+    margin_up   : points behind the athlete one rank above (inf for the leader)
+    margin_down : points ahead of the athlete one rank below (inf for the last)
+    wins_tie_up : whether a tie with the athlete above breaks in this athlete's favour
+    """
+
+    def __init__(self, totals: np.ndarray, name_rank: np.ndarray) -> None:
+        self.totals = totals
+        self.name_rank = name_rank
+        self.order = np.lexsort((name_rank, -totals))
+        n = len(totals)
+        self.pos = np.empty(n, dtype=np.int64)
+        self.pos[self.order] = np.arange(n)
+
+        ranked = totals[self.order].astype(np.float64)
+        up = np.full(n, np.inf)
+        down = np.full(n, np.inf)
+        up[1:] = ranked[:-1] - ranked[1:]
+        down[:-1] = ranked[:-1] - ranked[1:]
+        self.margin_up = up[self.pos]
+        self.margin_down = down[self.pos]
+        wins = np.zeros(n, dtype=bool)
+        wins[1:] = name_rank[self.order][1:] < name_rank[self.order][:-1]
+        self.wins_tie_up = wins[self.pos]
+
+        # Keys (-total, name_rank) in sorted order, with equal totals grouped in
+        # blocks so a key can be located with two searchsorted passes
+        self._neg_sorted = -totals[self.order]
+        block = np.concatenate(([0], np.cumsum(self._neg_sorted[1:] != self._neg_sorted[:-1])))
+        self._block = block
+        self._combined = block * n + name_rank[self.order]
+
+    @classmethod
+    def from_matrix(cls, matrix: LeaderboardMatrix, points: Optional[np.ndarray] = None) -> "RankMargins":
+        return cls(matrix.totals(points), matrix._name_rank)
+
+    def count_less(self, totals: np.ndarray, name_rank: np.ndarray) -> np.ndarray:
+        """Number of current keys that sort before each key (totals, name_rank)."""
+        neg = -np.asarray(totals)
+        lo = np.searchsorted(self._neg_sorted, neg, side="left")
+        hi = np.searchsorted(self._neg_sorted, neg, side="right")
+        tied = hi > lo
+        block = self._block[np.minimum(lo, len(self._block) - 1)] if len(self._block) else lo
+        within = np.searchsorted(self._combined, block * len(self.totals) + name_rank, side="left")
+        return np.where(tied, within, lo)
+
+    def _before(self, a_tot, a_rank, b_tot, b_rank) -> np.ndarray:
+        """Whether key a sorts before key b."""
+        return (a_tot > b_tot) | ((a_tot == b_tot) & (a_rank < b_rank))
+
+    def new_positions(self, a: np.ndarray, a_total: np.ndarray, b: np.ndarray, b_total: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        0-based positions of rows a and b (a != b) after their totals change to
+        a_total and b_total, everyone else unchanged.
+        """
+        rank_a, rank_b = self.name_rank[a], self.name_rank[b]
+        old_a, old_b = self.totals[a], self.totals[b]
+
+        def fixed_before(total, rank):
+            # Current keys before (total, rank), not counting a and b themselves
+            return (
+                self.count_less(total, rank)
+                - self._before(old_a, rank_a, total, rank)
+                - self._before(old_b, rank_b, total, rank)
+            )
+
+        new_a = fixed_before(a_total, rank_a) + self._before(b_total, rank_b, a_total, rank_a)
+        new_b = fixed_before(b_total, rank_b) + self._before(a_total, rank_a, b_total, rank_b)
+        return new_a, new_b
+
+    def points_to_move_up(self) -> np.ndarray:
+        """Points an athlete must add to pass the one above (margin, plus one on integer totals when the tie goes against them)."""
+        needed = self.margin_up.copy()
+        if self.totals.dtype.kind in "iu":
+            needed = needed + np.where(self.wins_tie_up, 0, 1)
+        return needed
+
+    def export(self, names: Sequence[str]) -> List[Dict]:
+        """Per-athlete rank and margins in leaderboard order, JSON-ready."""
+        to_move = self.points_to_move_up()
+        number = int if self.totals.dtype.kind in "iu" else float
+        rows = []
+        for p, a in enumerate(self.order.tolist()):
+            rows.append(
+                {
+                    "name": names[a],
+                    "rank": p + 1,
+                    "total_points": self.totals[a].item(),
+                    "points_behind": None if p == 0 else number(self.margin_up[a]),
+                    "points_ahead": None if p == len(self.order) - 1 else number(self.margin_down[a]),
+                    "points_to_move_up": None if p == 0 else number(to_move[a]),
+                }
+            )
+        return rows
+
+
+# --------------------------
+# ±1 swap sensitivity
+# --------------------------
+def _row_totals(points: np.ndarray, rows: np.ndarray, event: int, pts: np.ndarray) -> np.ndarray:
+    """Totals of `rows` with `event` scored as `pts`, summed column by column like a full rescore."""
+    dtype = np.float64 if points.dtype.kind == "f" or np.asarray(pts).dtype.kind == "f" else np.int64
+    totals = np.zeros(len(rows), dtype=dtype)
+    for j in range(points.shape[1]):
+        totals += pts if j == event else points[rows, j]
+    return totals
+
+
+def swap_sensitivity(
+    matrix: LeaderboardMatrix,
+    points: np.ndarray,
+    event_scales: Sequence[Optional[np.ndarray]],
+    margins: Optional[RankMargins] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Closed-form outcome of every ±1 place swap (the moves RippleEngine.swap()
+    simulates). Arrays are [athletes x events x 2], direction +1 (improve) then
+    -1 (worsen):
+
+    valid      : a neighbour exists and the event is scored by place
+    moves      : somebody's rank changes
+    jme        : somebody's rank changes but not the athlete's own
+    first_pos  : 0-based highest leaderboard position that changes (-1 if none)
+    """
+    if margins is None:
+        margins = RankMargins(matrix.totals(points), matrix._name_rank)
+    n, num_events = matrix.num_athletes, matrix.num_events
+    shape = (n, num_events, 2)
+    valid = np.zeros(shape, dtype=bool)
+    moves = np.zeros(shape, dtype=bool)
+    jme = np.zeros(shape, dtype=bool)
+    first_pos = np.full(shape, -1, dtype=np.int64)
+
+    for e in range(num_events):
+        scale = event_scales[e]
+        if scale is None:
+            continue
+        scale = np.asarray(scale)
+        places = matrix.places[:, e].astype(np.int64)
+        finishers = np.argsort(places, kind="stable")
+        idx = np.empty(n, dtype=np.int64)
+        idx[finishers] = np.arange(n)
+
+        for d, direction in enumerate((+1, -1)):
+            target = idx - direction
+            ok = (target >= 0) & (target < n)
+            a = np.flatnonzero(ok)
+            b = finishers[target[ok]]
+            with profiling.stage("swap_scan.totals"):
+                a_total = _row_totals(points, a, e, scale[places[a] - direction])
+                b_total = _row_totals(points, b, e, scale[places[b] + direction])
+            with profiling.stage("swap_scan.positions"):
+                new_a, new_b = margins.new_positions(a, a_total, b, b_total)
+
+            old_a, old_b = margins.pos[a], margins.pos[b]
+            a_moved, b_moved = new_a != old_a, new_b != old_b
+            changed = a_moved | b_moved
+            # Everyone else keeps their relative order, so the first position
+            # that differs is the highest position a or b leaves or enters
+            big = np.iinfo(np.int64).max
+            first = np.minimum(
+                np.where(a_moved, np.minimum(old_a, new_a), big),
+                np.where(b_moved, np.minimum(old_b, new_b), big),
+            )
+
+            valid[a, e, d] = True
+            moves[a, e, d] = changed
+            jme[a, e, d] = changed & ~a_moved
+            first_pos[a, e, d] = np.where(changed, first, -1)
+
+    return {"valid": valid, "moves": moves, "jme": jme, "first_pos": first_pos}
+
+
+def fragility_counts(sensitivity: Dict[str, np.ndarray], top: int = 10) -> Tuple[int, int]:
+    """(JME swaps, JME swaps that change the top `top`) from swap_sensitivity()."""
+    jme = sensitivity["jme"]
+    first = sensitivity["first_pos"]
+    return int(jme.sum()), int((jme & (first < top)).sum())
+
+
+def export_margins(matrix: LeaderboardMatrix, path: str, points: Optional[np.ndarray] = None) -> None:
+    """Write per-athlete ranks and margins as JSON for the front end."""
+    margins = RankMargins.from_matrix(matrix, points)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"athletes": margins.export(matrix.names)}, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""Fewest places an athlete needed to gain to reach a target rank.
+
+For athlete X and rank R, find the finish vector (one place per event) that
+puts X at rank R or better while gaining the fewest total places over X's
+actual finishes. A move works like RippleEngine.moves(): X takes the first
+finish position holding the new place and everyone in between shifts down
+one position, taking that position's place and points.
+
+Nobody X overtakes in an event can gain points and nobody behind X can pass
+them, so only the athletes currently ranked above X matter and at least
+(X's rank - R) of them have to end up behind. Per event, each candidate place
+closes X's deficit to every such rival by X's gain plus the rival's own loss
+from being shifted down. A multiple-choice knapsack table over the events
+gives, for each rival alone, the most deficit the remaining events can close
+for a given number of places. A depth-first search over the events then runs
+with a places allowance, deepened one at a time from the cost of passing the
+(X's rank - R)-th cheapest rival, and cuts any partial vector that no longer
+leaves enough rivals within reach; the first allowance that yields a vector
+is the optimum. A 40 x 14 field answers for every athlete in well under a
+second per target rank.
+
+    target = RankTarget(matrix)
+    target.solve(athlete_id, rank=1)      # fewest places to win
+    target.solve_all(rank=3)              # every athlete, podium
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import profiling
+from leaderboard_matrix import LeaderboardMatrix
+from rank_margins import RankMargins
+from scoring import batch_points, get_method, place_scale
+
+
+class RankTarget:
+    """
+    points    : [athletes x events] points under one method
+    scales    : per-event place -> points arrays
+    finishers : [athletes x events] athlete IDs in finish order (stable on ID)
+    position  : [athletes x events] each athlete's finish position
+    pos_points: [athletes x events] points held by each finish position
+    margins   : RankMargins of the current totals
+    """
+
+    def __init__(self, matrix: LeaderboardMatrix, method: str = "official", k: float = 0.5) -> None:
+        if not get_method(method).by_place:
+            raise ValueError(f"Method {method} scores raw results; place changes do not apply")
+        self.matrix = matrix
+        self.method, self.k = method, k
+        self.points = batch_points(matrix, method, k=k)
+        self.scales = [np.asarray(place_scale(matrix, j, method=method, k=k)) for j in range(matrix.num_events)]
+        self.margins = RankMargins(matrix.totals(self.points), matrix._name_rank)
+
+        places = matrix.places.astype(np.int64)
+        self.finishers = np.argsort(places, axis=0, kind="stable")
+        self.sorted_places = np.take_along_axis(places, self.finishers, axis=0)
+        self.position = np.empty_like(self.finishers)
+        np.put_along_axis(self.position, self.finishers, np.arange(matrix.num_athletes)[:, None], axis=0)
+        self.integral = self.points.dtype.kind in "iu"
+        self.pos_points = np.stack(
+            [self.scales[j][self.sorted_places[:, j]] for j in range(matrix.num_events)], axis=1
+        ).astype(np.int64 if self.integral else np.float64)
+
+    # --------------------------
+    # Search
+    # --------------------------
+    def _options(self, x: int, e: int, rivals: np.ndarray) -> List[Tuple[int, int, np.ndarray]]:
+        """(places gained, new place, deficit closed per rival) for every better place X could take in event e."""
+        sorted_places = self.sorted_places[:, e]
+        pts = self.pos_points[:, e]
+        p = int(self.position[x, e])
+        old = int(sorted_places[p])
+        rival_pos = self.position[rivals, e]
+        # A rival shifted from position i to i + 1 loses pts[i] - pts[i + 1]
+        shifted_loss = np.where(rival_pos < p, pts[rival_pos] - pts[np.minimum(rival_pos + 1, p)], 0)
+
+        options = []
+        if old < 1 or p == 0:
+            return options
+        # First position of each better place: later positions on the same place score the same but shift fewer rivals
+        first = np.flatnonzero((sorted_places[:p] >= 1) & np.r_[True, sorted_places[1:p] != sorted_places[: p - 1]])
+        for pos in first[::-1].tolist():
+            new = int(sorted_places[pos])
+            if new >= old:
+                continue
+            gain = pts[pos] - pts[p]
+            closed = gain + np.where(rival_pos >= pos, shifted_loss, 0)
+            options.append((old - new, new, closed))
+        return options
+
+    @staticmethod
+    def _knapsack(options: Sequence[List[Tuple[int, int, np.ndarray]]], num_rivals: int, budget: int, dtype) -> List[np.ndarray]:
+        """
+        best[i][r, c]: most of rival r's deficit events i.. can close for at most
+        c places gained (each event contributing one option, or none).
+        """
+        best = [np.zeros((num_rivals, budget + 1), dtype=dtype)]
+        for opts in reversed(options):
+            after = best[0]
+            cur = after.copy()
+            for cost, _, closed in opts:
+                np.maximum(cur[:, cost:], after[:, : budget + 1 - cost] + closed[:, None], out=cur[:, cost:])
+            best.insert(0, cur)
+        return best
+
+    def solve(self, athlete: int, rank: int, max_nodes: int = 1_000_000) -> Dict:
+        """
+        Fewest places `athlete` needed to gain to finish at `rank` or better.
+        Returns the new place per changed event, or places_gained None when no
+        finish vector gets there. optimal is False if max_nodes cut the search short.
+        """
+        m = self.margins
+        x = int(athlete)
+        current = int(m.pos[x]) + 1
+        result = {
+            "id": x,
+            "name": self.matrix.names[x],
+            "rank": current,
+            "target_rank": rank,
+            "total_points": m.totals[x].item(),
+        }
+        if current <= rank:
+            return {**result, "places_gained": 0, "moves": [], "new_rank": current, "new_total_points": m.totals[x].item(), "optimal": True}
+
+        rivals = m.order[: current - 1]
+        needed = current - rank  # rivals that must end up behind X
+        deficit = m.totals[rivals] - m.totals[x]
+        wins_tie = m.name_rank[x] < m.name_rank[rivals]
+        if self.integral:
+            threshold = deficit + np.where(wins_tie, 0, 1)
+        else:
+            # Float totals depend on summation order, so let near-ties through
+            # here and settle them with a full rescore of the finished vector
+            threshold = deficit - 1e-9 * (1.0 + np.abs(m.totals).max())
+
+        with profiling.stage("rank_target.options"):
+            options = [self._options(x, e, rivals) for e in range(self.matrix.num_events)]
+            # Events with the biggest possible swing first, so bounds tighten early
+            events = sorted(
+                (e for e in range(self.matrix.num_events) if options[e]),
+                key=lambda e: -max(closed.max() for _, _, closed in options[e]),
+            )
+            options = [options[e] for e in events]
+            budget = sum(max(o[0] for o in opts) for opts in options)
+            for opts in options:
+                opts.sort(key=lambda o: o[0])
+        with profiling.stage("rank_target.knapsack"):
+            best = self._knapsack(options, len(rivals), budget, threshold.dtype)
+
+        # Per event: option 0 is keeping the actual place
+        costs = [[0] + [o[0] for o in opts] for opts in options]
+        closes = [np.vstack([np.zeros(len(rivals), dtype=threshold.dtype)] + [o[2] for o in opts]) for opts in options]
+        state = {"limit": 0, "choice": None, "nodes": 0}
+        chosen = [0] * len(options)
+
+        def targets(choice: List[int]) -> Dict[int, int]:
+            return {events[i]: options[i][o - 1][1] for i, o in enumerate(choice) if o}
+
+        def exact(choice: List[int]) -> bool:
+            return self.rescore(x, targets(choice))[0] <= rank
+
+        def search(i: int, cost: int, closed: np.ndarray) -> bool:
+            state["nodes"] += 1
+            if int((closed >= threshold).sum()) >= needed and (self.integral or exact(chosen[:i])):
+                state["choice"] = chosen[:i]
+                return True
+            if i == len(options) or state["nodes"] >= max_nodes:
+                return False
+            # Prune unless enough rivals could each still be passed within the allowance
+            allowance = state["limit"] - cost
+            if int((best[i][:, allowance] >= threshold - closed).sum()) < needed:
+                return False
+            for o, c in enumerate(costs[i]):
+                if c > allowance:
+                    break
+                chosen[i] = o
+                if search(i + 1, cost + c, closed + closes[i][o]):
+                    return True
+            chosen[i] = 0
+            return False
+
+        with profiling.stage("rank_target.search"):
+            # The (current - rank)-th cheapest rival to pass on its own bounds the
+            # optimum from below. Deepen the allowance one place at a time from
+            # there: the first allowance with a solution is the optimum, and
+            # each pass only visits partial vectors that could still fit in it
+            reach = best[0][:, -1] >= threshold
+            if int(reach.sum()) >= needed:
+                cheapest = np.argmax(best[0][reach] >= threshold[reach, None], axis=1)
+                state["limit"] = int(np.partition(cheapest, needed - 1)[needed - 1])
+                start = np.zeros(len(rivals), dtype=threshold.dtype)
+                while state["limit"] <= budget and state["nodes"] < max_nodes and not search(0, 0, start):
+                    state["limit"] += 1
+        profiling.count("rank_target.nodes", state["nodes"])
+        optimal = state["nodes"] < max_nodes
+
+        if state["choice"] is None:
+            return {**result, "places_gained": None, "moves": [], "new_rank": None, "new_total_points": None, "optimal": optimal}
+
+        moved = targets(state["choice"])
+        places_gained = sum(costs[i][o] for i, o in enumerate(state["choice"]))
+        new_rank, new_total = self.rescore(x, moved)
+        moves = [
+            {
+                "event_id": e,
+                "event": self.matrix.events[e],
+                "place": int(self.matrix.places[x, e]),
+                "new_place": new,
+            }
+            for e, new in sorted(moved.items())
+        ]
+        return {
+            **result,
+            "places_gained": places_gained,
+            "moves": moves,
+            "new_rank": new_rank,
+            "new_total_points": new_total,
+            "optimal": optimal,
+        }
+
+    def rescore(self, athlete: int, targets: Dict[int, int]) -> Tuple[int, float]:
+        """(rank, total points) of `athlete` after moving to place targets[event] in each event, by full rescore."""
+        points = self.points.copy()
+        places = self.matrix.places.astype(np.int64)
+        for e, place in targets.items():
+            order = self.finishers[:, e].tolist()
+            order.remove(athlete)
+            order.insert(int(np.searchsorted(self.sorted_places[:, e], place, side="left")), athlete)
+            places[order, e] = self.sorted_places[:, e]
+            points[:, e] = self.scales[e][places[:, e]]
+        ranks, _, totals = self.matrix.compute_leaderboard(points)
+        return int(ranks[athlete]), totals[athlete].item()
+
+    def solve_all(self, rank: int, max_nodes: int = 1_000_000) -> List[Dict]:
+        """solve() for every athlete, in leaderboard order."""
+        return [self.solve(a, rank, max_nodes) for a in self.margins.order.tolist()]
+
+
+def report(
+    matrix: LeaderboardMatrix,
+    ranks: Sequence[int] = (1, 3),
+    suffix: str = "",
+    results_dir: str = "results",
+    method: str = "official",
+    k: float = 0.5,
+    athletes: Optional[Sequence] = None,
+) -> Dict:
+    """
+    Fewest places to each target rank for the given athletes (default: all),
+    printed as a table and saved to results/rank_target{suffix}.json.
+    """
+    target = RankTarget(matrix, method=method, k=k)
+    ids = [matrix.athlete_ids.resolve(a) for a in athletes] if athletes else target.margins.order.tolist()
+    out = {"method": method, "k": k, "targets": {}}
+    for rank in ranks:
+        rows = [target.solve(a, rank) for a in ids]
+        out["targets"][str(rank)] = rows
+        print(f"-- rank {rank}: fewest places gained")
+        for row in rows:
+            if row["places_gained"] is None:
+                detail = "out of reach"
+            else:
+                detail = f"{row['places_gained']:>4}  " + ", ".join(
+                    f"{mv['event']} {mv['place']}->{mv['new_place']}" for mv in row["moves"]
+                )
+            flag = "" if row["optimal"] else "  (search cut short)"
+            print(f"{row['rank']:>4}  {matrix.athlete_ids.label(row['id']):<30} {detail}{flag}".rstrip())
+
+    Path(results_dir).mkdir(exist_ok=True)
+    with open(f"{results_dir}/rank_target{suffix}.json", "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=2, ensure_ascii=False)
+    profiling.write_summary(f"{results_dir}/rank_target{suffix}.profile.json", {"athletes": matrix.num_athletes, "events": matrix.num_events})
+    return out
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Shared score normalization: each result cell is parsed once into a typed value.
+
+A cell ("48:54.00", "1:02:03.50", "265 lb", "CAP+6", "57.03", "120 reps")
+normalizes to a Score of one of the kinds
+
+    time : seconds, lower is better
+    load : pounds, higher is better (lift events)
+    cap  : reps still to do at the time cap, lower is better
+    reps : a bare rep count, higher is better
+
+alongside the two legacy readings the analyses were written against:
+parse_raw_score() (rescoring, CAP+n sorts after every time) and
+parse_time_seconds() (time-gap reports, plain times only). ScoreCache memoizes
+normalize_score() per cell; ScoreColumns holds the two legacy readings as
+[athletes x events] arrays, parsing every distinct cell once.
+"""
+
+import re
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+KINDS = ("time", "load", "cap", "reps")
+LIFT_KEYWORDS = ("Back Squat", "Snatch", "Clean")
+
+_LEADING_INT_RE = re.compile(r"(\d+)")
+_TIME_LIKE_RE = re.compile(r"^\d{1,2}:\d{2}(?::\d{2}(?:\.\d{1,2})?)?(?:\.\d{1,2})?$|^\d+(?:\.\d{1,2})?$")
+_NOT_TIME = ("lb", "pt", "rep", "cap", "dq", "wd", "—", "-", "n/a")
+_LOAD_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(?:lbs?)?$", re.IGNORECASE)
+_REPS_RE = re.compile(r"^(\d+)\s*reps?$", re.IGNORECASE)
+
+
+def is_lift(event_name: str) -> bool:
+    return any(keyword in event_name for keyword in LIFT_KEYWORDS)
+
+
+# --------------------------
+# Legacy readings
+# --------------------------
+def parse_raw_score(event_name, raw):
+    if raw is None:
+        return None, True
+    raw = str(raw).strip()
+
+    if is_lift(event_name):
+        m = _LEADING_INT_RE.match(raw)
+        if m:
+            return float(m.group(1)), False  # higher is better
+        return None, False
+
+    if raw.startswith("CAP+"):
+        try:
+            over = int(raw.split("+")[1])
+        except:
+            over = 999
+        return 1e6 + over, True
+
+    if ":" in raw:
+        parts = raw.split(":")
+        if len(parts) == 2:
+            m, s = parts
+            total = float(m) * 60 + float(s)
+        elif len(parts) == 3:
+            h, m, s = parts
+            total = float(h) * 3600 + float(m) * 60 + float(s)
+        else:
+            return None, True
+        return total, True
+
+    try:
+        return float(raw), True
+    except:
+        return None, True
+
+
+def is_time_like(value: str) -> bool:
+    if not value:
+        return False
+    s = str(value).strip().lower()
+    # Exclude non-time units
+    if any(x in s for x in _NOT_TIME):
+        return False
+    # Accept mm:ss, ss.ss, hh:mm:ss, etc.
+    return bool(_TIME_LIKE_RE.match(s))
+
+
+def parse_time_seconds(value: str) -> Optional[float]:
+    if not is_time_like(value):
+        return None
+    s = str(value).strip()
+    # Handle pure seconds like 9.40 or 57.03
+    if ":" not in s:
+        try:
+            return float(s)
+        except ValueError:
+            return None
+    try:
+        parts = s.split(":")
+        parts = [p for p in parts if p != ""]
+        if len(parts) == 2:
+            # mm:ss(.ss)
+            minutes = int(parts[0])
+            seconds = float(parts[1])
+            return minutes * 60 + seconds
+        if len(parts) == 3:
+            # hh:mm:ss(.ss)
+            hours = int(parts[0])
+            minutes = int(parts[1])
+            seconds = float(parts[2])
+            return hours * 3600 + minutes * 60 + seconds
+    except Exception:
+        return None
+    return None
+
+
+# --------------------------
+# Typed scores
+# --------------------------
+class Score(NamedTuple):
+    kind: Optional[str]  # one of KINDS, None if unparseable
+    value: float  # seconds / lb / reps left at the cap / reps (NaN if unparseable)
+    lower_is_better: bool
+    raw: float  # parse_raw_score() value (NaN if None)
+    seconds: float  # parse_time_seconds() value (NaN if None)
+
+
+def _nan(value: Optional[float]) -> float:
+    return float("nan") if value is None else value
+
+
+def normalize_score(event_name: str, cell: Optional[str]) -> Score:
+    """Parse one result cell in the context of its event."""
+    raw, lower = parse_raw_score(event_name, cell)
+    seconds = parse_time_seconds(cell) if cell is not None else None
+    s = str(cell).strip() if cell is not None else ""
+
+    if is_lift(event_name):
+        m = _LOAD_RE.match(s)
+        if m:
+            return Score("load", float(m.group(1)), False, _nan(raw), _nan(seconds))
+    elif seconds is not None:
+        return Score("time", seconds, True, _nan(raw), seconds)
+    elif s.upper().startswith("CAP+"):
+        m = _LEADING_INT_RE.match(s[4:].strip())
+        if m:
+            return Score("cap", float(m.group(1)), True, _nan(raw), _nan(seconds))
+    else:
+        m = _REPS_RE.match(s)
+        if m:
+            return Score("reps", float(m.group(1)), False, _nan(raw), _nan(seconds))
+    return Score(None, float("nan"), lower, _nan(raw), _nan(seconds))
+
+
+class ScoreCache:
+    """Memo of normalize_score() keyed on (is lift event, cell); parsing only depends on both."""
+
+    def __init__(self) -> None:
+        self._cache: Dict[Tuple[bool, Optional[str]], Score] = {}
+        self._seconds: Dict[Optional[str], Optional[float]] = {}
+        self._lifts: Dict[str, bool] = {}
+
+    def __call__(self, event_name: str, cell: Optional[str]) -> Score:
+        lift = self._lifts.get(event_name)
+        if lift is None:
+            lift = self._lifts[event_name] = is_lift(event_name)
+        key = (lift, cell)
+        score = self._cache.get(key)
+        if score is None:
+            score = self._cache[key] = normalize_score(event_name, cell)
+        return score
+
+    def seconds(self, cell: Optional[str]) -> Optional[float]:
+        """parse_time_seconds() through the cache (it does not depend on the event)."""
+        if cell not in self._seconds:
+            self._seconds[cell] = parse_time_seconds(cell) if cell is not None else None
+        return self._seconds[cell]
+
+
+class ScoreColumns:
+    """
+    raw     : float64 [athletes x events] parse_raw_score() value (NaN if none)
+    seconds : float64 [athletes x events] parse_time_seconds() value (NaN if none)
+    lower_is_better : bool [events] direction of `raw`, taken from the last parseable cell
+    """
+
+    def __init__(self, raw: np.ndarray, seconds: np.ndarray, lower_is_better: np.ndarray) -> None:
+        self.raw = raw
+        self.seconds = seconds
+        self.lower_is_better = lower_is_better
+
+    @classmethod
+    def from_indexed(cls, events: Sequence[str], strings: Sequence[str], time_idx: np.ndarray) -> "ScoreColumns":
+        """Scores for a [athletes x events] matrix of indices into `strings` (-1 = no cell)."""
+        lifts = [is_lift(event) for event in events]
+        num_strings = len(strings)
+        shape = time_idx.shape
+
+        # Parse each referenced string once per lift / non-lift kind, then gather;
+        # index -1 lands on a trailing "no cell" entry
+        tables = {}
+        for lift in set(lifts):
+            event = next(e for e, l in zip(events, lifts) if l == lift)
+            cols = [j for j, l in enumerate(lifts) if l == lift]
+            ids = np.unique(time_idx[:, cols]) if shape[0] else np.zeros(0, dtype=np.int64)
+            table = np.full((2, num_strings + 1), np.nan, dtype=np.float64)
+            lower = np.ones(num_strings + 1, dtype=bool)
+            for i in ids[ids >= 0].tolist():
+                score = normalize_score(event, strings[i])
+                table[:, i] = (score.raw, score.seconds)
+                lower[i] = parse_raw_score(event, strings[i])[1]
+            tables[lift] = table, lower
+
+        raw = np.full(shape, np.nan, dtype=np.float64)
+        seconds = np.full(shape, np.nan, dtype=np.float64)
+        lower_is_better = np.ones(len(events), dtype=bool)
+        for j, lift in enumerate(lifts):
+            table, lower = tables[lift]
+            column = time_idx[:, j]
+            raw[:, j] = table[0, column]
+            seconds[:, j] = table[1, column]
+            valid = column[~np.isnan(table[0, column])]
+            if valid.size:
+                lower_is_better[j] = lower[valid[-1]]
+        return cls(raw, seconds, lower_is_better)
+
+    @classmethod
+    def from_cells(cls, events: Sequence[str], cells: Sequence[Sequence[Optional[str]]]) -> "ScoreColumns":
+        """Scores for [athletes][events] raw result cells (None = no cell)."""
+        index: Dict[str, int] = {}
+        strings: List[str] = []
+        time_idx = np.full((len(cells), len(events)), -1, dtype=np.int64)
+        for i, row in enumerate(cells):
+            for j, cell in enumerate(row):
+                if cell is None:
+                    continue
+                k = index.get(cell)
+                if k is None:
+                    k = index[cell] = len(strings)
+                    strings.append(cell)
+                time_idx[i, j] = k
+        return cls.from_indexed(events, strings, time_idx)
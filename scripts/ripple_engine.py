@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Incremental ripple engine for place perturbations.
+
+Instead of deep-copying every athlete and re-sorting the whole leaderboard for
+each perturbation, the engine keeps a totals vector and a sorted rank index.
+A swap only changes two athletes' totals, so only those two rows are re-summed,
+the two athletes are re-inserted locally, the rank changes are read off and the
+index is restored.
+
+Multi-place moves are walked outward one place at a time: moving an athlete
+one place further shifts exactly one more finisher, so each step again only
+changes two totals on top of the previous scenario.
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from leaderboard_matrix import LeaderboardMatrix
+
+
+class RippleEngine:
+    def __init__(
+        self,
+        names: Sequence[str],
+        places: Sequence[Sequence[int]],
+        event_scales: Sequence[Optional[Sequence[float]]],
+        points: Optional[Sequence[Sequence[float]]] = None,
+        name_rank: Optional[Sequence[int]] = None,
+    ) -> None:
+        """
+        names        : athlete display names, one per athlete ID (row)
+        places       : places[athlete][event] finishing place
+        event_scales : per-event place -> points lookup (dict or place-indexed list);
+                       None for events whose points do not depend on place
+        points       : points[athlete][event] current points (required if any scale is None)
+        name_rank    : position of each athlete in name order, rows breaking ties
+                       (LeaderboardMatrix._name_rank; derived from names if omitted)
+        """
+        self.names = list(names)
+        self.places = [list(row) for row in places]
+        self.event_scales = list(event_scales)
+        self.num_athletes = len(self.names)
+        self.num_events = len(self.event_scales)
+
+        if points is None:
+            points = [
+                [self.event_scales[e][self.places[a][e]] for e in range(self.num_events)]
+                for a in range(self.num_athletes)
+            ]
+        self.points = [list(row) for row in points]
+        self.totals = [sum(row) for row in self.points]
+
+        # Names only matter for the tie-break, so they are compared once here as integers
+        if name_rank is None:
+            name_rank = [0] * self.num_athletes
+            for r, a in enumerate(sorted(range(self.num_athletes), key=lambda a: self.names[a])):
+                name_rank[a] = r
+        self.name_rank = list(name_rank)
+
+        # Same tie-break as compute_leaderboard(): points desc, then name, then row
+        self.order = sorted(range(self.num_athletes), key=self._key)
+        self.pos = [0] * self.num_athletes
+        for p, a in enumerate(self.order):
+            self.pos[a] = p
+
+        # Per-event finish order (stable on row order, like perturb())
+        self.by_place = [
+            sorted(range(self.num_athletes), key=lambda a, e=e: self.places[a][e])
+            for e in range(self.num_events)
+        ]
+        self.place_idx = [[0] * self.num_events for _ in range(self.num_athletes)]
+        for e, finishers in enumerate(self.by_place):
+            for i, a in enumerate(finishers):
+                self.place_idx[a][e] = i
+
+    @classmethod
+    def from_athletes(cls, athletes: List[Dict], events: List[str], point_system: Dict[int, float]) -> "RippleEngine":
+        """Build an engine from the leaderboard JSON athlete list and one shared point system."""
+        names = [a["name"] for a in athletes]
+        places = [[a["events"][event]["place"] for event in events] for a in athletes]
+        return cls(names, places, [point_system] * len(events))
+
+    @classmethod
+    def from_matrix(
+        cls,
+        matrix: "LeaderboardMatrix",
+        event_scales: Optional[Sequence[Optional[Sequence[float]]]] = None,
+        points: Optional[np.ndarray] = None,
+    ) -> "RippleEngine":
+        """Build an engine from a LeaderboardMatrix, by default scored with its own event scales."""
+        if event_scales is None:
+            event_scales = [scale.tolist() for scale in matrix.event_scales]
+        if points is not None:
+            points = np.asarray(points).tolist()
+        return cls(matrix.names, matrix.places.tolist(), event_scales, points, matrix._name_rank.tolist())
+
+    def _key(self, a: int) -> Tuple[float, int]:
+        return (-self.totals[a], self.name_rank[a])
+
+    def ranks(self) -> List[int]:
+        """1-based rank per athlete ID."""
+        return [self.pos[a] + 1 for a in range(self.num_athletes)]
+
+    def leaderboard(self) -> List[Tuple[int, float]]:
+        """(athlete ID, total) in leaderboard order."""
+        return [(a, self.totals[a]) for a in self.order]
+
+    def _row_total(self, a: int, event: int, pts: float) -> float:
+        """Athlete total with `event` scored as `pts`, summed left to right like a full rescore."""
+        row = self.points[a]
+        return sum(row[:event] + [pts] + row[event + 1:])
+
+    # --------------------------
+    # Local re-insertion
+    # --------------------------
+    def _reinsert(self, a: int, moved: Dict[int, int]) -> None:
+        """Bubble athlete `a` to its sorted position, remembering original positions in `moved`."""
+        order, pos, key = self.order, self.pos, self._key
+        p = pos[a]
+        k = key(a)
+        while p > 0 and key(order[p - 1]) > k:
+            other = order[p - 1]
+            moved.setdefault(other, p - 1)
+            order[p], pos[other] = other, p
+            p -= 1
+        while p < self.num_athletes - 1 and key(order[p + 1]) < k:
+            other = order[p + 1]
+            moved.setdefault(other, p + 1)
+            order[p], pos[other] = other, p
+            p += 1
+        order[p], pos[a] = a, p
+
+    def swap(self, athlete: int, event: int, direction: int) -> Optional[List[Tuple[int, int, int]]]:
+        """
+        Swap `athlete` with its neighbour in `event` and return the rank changes,
+        leaving the engine unchanged afterwards.
+
+        direction = +1 (improve by one place) or -1 (worsen by one place)
+        Returns None if the move is out of bounds, otherwise a list of
+        (athlete, old_rank, new_rank) sorted by old rank.
+        """
+        finishers = self.by_place[event]
+        idx = self.place_idx[athlete][event]
+        if direction == -1 and idx == len(finishers) - 1:
+            return None
+        if direction == +1 and idx == 0:
+            return None
+        neighbour = finishers[idx - direction]
+
+        scale = self.event_scales[event]
+        if scale is None:
+            return []
+        place_a = self.places[athlete][event]
+        place_b = self.places[neighbour][event]
+        old_a, old_b = self.totals[athlete], self.totals[neighbour]
+
+        # Re-summing the two rows (rather than adding a delta) keeps float ties
+        # breaking exactly as they would after a full rescore. Each athlete is
+        # re-inserted before the next total changes so the index stays sorted.
+        moved = {athlete: self.pos[athlete], neighbour: self.pos[neighbour]}
+        self.totals[athlete] = self._row_total(athlete, event, scale[place_a - direction])
+        self._reinsert(athlete, moved)
+        self.totals[neighbour] = self._row_total(neighbour, event, scale[place_b + direction])
+        self._reinsert(neighbour, moved)
+
+        changes = sorted(
+            (old_p + 1, a, self.pos[a] + 1) for a, old_p in moved.items() if self.pos[a] != old_p
+        )
+
+        # Undo: restore totals and the touched slice of the rank index
+        self.totals[athlete], self.totals[neighbour] = old_a, old_b
+        for a, old_p in moved.items():
+            self.order[old_p] = a
+            self.pos[a] = old_p
+
+        return [(a, old_rank, new_rank) for old_rank, a, new_rank in changes]
+
+    def moves(self, athlete: int, event: int) -> Iterator[Tuple[int, List[Tuple[int, int, int]]]]:
+        """
+        Yield (position, changes) for every other finish position of `athlete` in
+        `event`: the athlete is taken out of the finish order and re-inserted at
+        0-based `position`, everyone in between shifts one place, and every
+        position keeps its place (and points). changes lists (athlete, old_rank,
+        new_rank) for every athlete whose rank differs, sorted by old rank.
+        Positions are walked outward, better places first; the engine is
+        unchanged afterwards.
+        """
+        scale = self.event_scales[event]
+        finishers = self.by_place[event]
+        start = self.place_idx[athlete][event]
+        if scale is None:
+            for position in range(len(finishers)):
+                if position != start:
+                    yield position, []
+            return
+        places = [self.places[a][event] for a in finishers]
+
+        for step in (-1, +1):
+            saved = {}
+            moved: Dict[int, int] = {}
+            position = start + step
+            while 0 <= position < len(finishers):
+                # One more finisher slides into the slot the athlete has left
+                other = finishers[position]
+                saved.setdefault(other, self.totals[other])
+                saved.setdefault(athlete, self.totals[athlete])
+                moved.setdefault(athlete, self.pos[athlete])
+                moved.setdefault(other, self.pos[other])
+                self.totals[athlete] = self._row_total(athlete, event, scale[places[position]])
+                self._reinsert(athlete, moved)
+                self.totals[other] = self._row_total(other, event, scale[places[position - step]])
+                self._reinsert(other, moved)
+
+                changes = sorted((old_p + 1, a, self.pos[a] + 1) for a, old_p in moved.items() if self.pos[a] != old_p)
+                yield position, [(a, old_rank, new_rank) for old_rank, a, new_rank in changes]
+                position += step
+
+            for a, total in saved.items():
+                self.totals[a] = total
+            for a, old_p in moved.items():
+                self.order[old_p] = a
+                self.pos[a] = old_p
+
+    def move_scan(self) -> Iterator[Tuple[int, int, int, List[Tuple[int, int, int]]]]:
+        """
+        Yield (athlete, event, position, changes) for every multi-place move:
+        each athlete to each other 0-based finish position of each event (see
+        moves()). changes is empty where nothing moves.
+        """
+        for a in range(self.num_athletes):
+            for e in range(self.num_events):
+                for position, changes in self.moves(a, e):
+                    yield a, e, position, changes
+
+    def jme_scan(self) -> Iterator[Tuple[int, int, int, List[Tuple[int, int, int]]]]:
+        """
+        Yield (athlete, event, direction, changes) for every ±1 swap that leaves
+        the athlete's own rank unchanged but moves somebody else (a JME).
+        """
+        for a in range(self.num_athletes):
+            for e in range(self.num_events):
+                for direction in (+1, -1):
+                    changes = self.swap(a, e, direction)
+                    if not changes:
+                        continue
+                    if any(other == a for other, _, _ in changes):
+                        continue
+                    yield a, e, direction, changes
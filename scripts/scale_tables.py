@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Canonical integer-indexed point scales, built once and shared.
+
+Scales are kept as place-indexed tuples (index 0 = no place, scores 0) per
+season and field size. Ordinal keys ("1st", "22nd") are only produced when a
+map is written to JSON (ordinal_map()) and only parsed when one is read back
+(place_points()); both directions are memoized per key. Only the converter's
+needs are covered without numpy; official_scale_array() hands out cached
+read-only NumPy copies for the analyses.
+"""
+
+from functools import lru_cache
+from typing import Dict, Iterable, Mapping, Tuple
+
+
+# Points for places 1..N of each official scale, keyed by season and by the
+# field size the scale is written for
+OFFICIAL_SCALES: Dict[int, Dict[int, Tuple[int, ...]]] = {
+    2024: {
+        40: (
+            100, 97, 94, 91, 88, 85, 82, 79, 76, 73, 70, 67, 64, 61, 58, 55, 52, 49, 46, 43,
+            40, 37, 34, 32, 30, 28, 26, 24, 22, 20, 18, 16, 14, 12, 10, 8, 6, 4, 2, 0,
+        ),
+        30: (
+            100, 96, 92, 88, 84, 80, 76, 72, 68, 64, 60, 56, 52, 48, 45, 42, 39, 36, 33, 30,
+            27, 24, 21, 18, 15, 12, 9, 6, 3, 0,
+        ),
+        20: (100, 95, 90, 85, 80, 75, 70, 65, 60, 55, 50, 45, 40, 35, 30, 25, 20, 15, 10, 0),
+        10: (100, 90, 80, 70, 60, 50, 40, 30, 20, 10),
+    },
+}
+
+
+# --------------------------
+# Ordinals (JSON boundary only)
+# --------------------------
+@lru_cache(maxsize=None)
+def get_place_string(place: int) -> str:
+    if place == 1:
+        return "1st"
+    if place == 2:
+        return "2nd"
+    if place == 3:
+        return "3rd"
+    if place % 10 == 1 and place != 11:
+        return f"{place}st"
+    if place % 10 == 2 and place != 12:
+        return f"{place}nd"
+    if place % 10 == 3 and place != 13:
+        return f"{place}rd"
+    return f"{place}th"
+
+
+@lru_cache(maxsize=None)
+def place_number(key: str) -> int:
+    """'22nd' -> 22."""
+    return int(key.rstrip("stndrh"))
+
+
+def ordinal_map(scale: Iterable[int]) -> Dict[str, int]:
+    """Place-indexed scale (index 0 unused) -> {"1st": points, ...} for JSON output."""
+    return {get_place_string(place): pts for place, pts in enumerate(scale) if place}
+
+
+def place_points(point_map: Mapping[str, int]) -> Dict[int, int]:
+    """Ordinal-keyed {"1st": 100, ...} map from JSON -> {1: 100, ...}."""
+    return {place_number(k): v for k, v in point_map.items()}
+
+
+# --------------------------
+# Official scales
+# --------------------------
+def scale_sizes(year: int) -> Tuple[int, ...]:
+    """Field sizes the season's official scales are written for, ascending."""
+    try:
+        return tuple(sorted(OFFICIAL_SCALES[year]))
+    except KeyError:
+        raise ValueError(f"No official point scales for {year}") from None
+
+
+def scale_for_field(year: int, field_size: int) -> int:
+    """Which scale a field of `field_size` uses: the smallest one that covers it (25 -> 30), capped at the largest."""
+    sizes = scale_sizes(year)
+    for size in sizes:
+        if field_size <= size:
+            return size
+    return sizes[-1]
+
+
+@lru_cache(maxsize=None)
+def full_scale(year: int, size: int) -> Tuple[int, ...]:
+    """Place-indexed official scale for fields of `size` (index 0 unused)."""
+    return (0,) + OFFICIAL_SCALES[year][size]
+
+
+@lru_cache(maxsize=None)
+def official_scale(year: int, field_size: int) -> Tuple[int, ...]:
+    """Place-indexed points for an event of `field_size`: its scale, truncated to the field."""
+    return full_scale(year, scale_for_field(year, field_size))[: field_size + 1]
+
+
+@lru_cache(maxsize=None)
+def official_scale_array(year: int, field_size: int):
+    """official_scale() as a read-only int64 NumPy array (needs numpy)."""
+    import numpy as np
+
+    array = np.array(official_scale(year, field_size), dtype=np.int64)
+    array.setflags(write=False)
+    return array
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""Batched scoring: whole [athletes x events] points matrices in one call per method.
+
+Every function here takes place or raw-score matrices and returns points for
+the full field at once. decay_points() also accepts a vector of k values and
+returns a [k x athletes x events] tensor, so a decay sweep is one broadcast.
+
+Scoring methods are looked up by name in a registry of kernels. A kernel takes
+(places, raw, field_size) arrays, where the athlete axis is -2 and the event axis
+is -1 so leading batch axes broadcast through, plus keyword context it may
+ignore (event_scales, lower_is_better, k). It returns points. New methods
+plug in without touching the sweeps or ripple scans:
+
+    @register_method("logistic")
+    def logistic_points(places, raw, field_size, **params):
+        return np.round(100 / (1 + np.exp((places - field_size / 2) / 4)), 4)
+"""
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+import scale_tables
+from leaderboard_matrix import LeaderboardMatrix
+
+
+def official_points(places: np.ndarray, event_scales: Union[np.ndarray, Sequence[np.ndarray]]) -> np.ndarray:
+    """Look up places in per-event place-indexed scales ([events x places] table)."""
+    table = np.asarray(np.stack(event_scales) if isinstance(event_scales, (list, tuple)) else event_scales)
+    return table[np.arange(places.shape[-1]), places].astype(np.int64)
+
+
+def linear_points(places: np.ndarray, num_athletes: Optional[Union[int, np.ndarray]] = None) -> np.ndarray:
+    if num_athletes is None:
+        num_athletes = places.shape[-2]
+    return num_athletes - places.astype(np.int64) + 1
+
+
+def normalized_points(places: np.ndarray, num_athletes: Optional[Union[int, np.ndarray]] = None) -> np.ndarray:
+    if num_athletes is None:
+        num_athletes = places.shape[-2]
+    return (num_athletes - places.astype(np.int64) + 1) / num_athletes
+
+
+def decay_points(places: np.ndarray, k: Union[float, Sequence[float], np.ndarray] = 0.5) -> np.ndarray:
+    """
+    100 * exp(-k * (place - 1)) rounded to 4 places.
+    A scalar k returns places.shape; a vector of K values returns [K, *places.shape].
+    """
+    k = np.asarray(k, dtype=np.float64)
+    offset = places.astype(np.float64) - 1
+    if k.ndim:
+        k = k.reshape(k.shape + (1,) * offset.ndim)
+    return np.round(100 * np.exp(-k * offset), 4)
+
+
+def continuous_points(raw: np.ndarray, lower_is_better: np.ndarray) -> np.ndarray:
+    """Min-max normalise each event's raw scores to 0-100; unparseable results (NaN) score 0."""
+    valid = ~np.isnan(raw)
+    mn = np.where(valid, raw, np.inf).min(axis=-2, keepdims=True)
+    mx = np.where(valid, raw, -np.inf).max(axis=-2, keepdims=True)
+
+    spread = mx - mn
+    safe_spread = np.where(spread > 0, spread, 1.0)
+    norm = np.where(lower_is_better, (mx - raw) / safe_spread, (raw - mn) / safe_spread)
+    norm = np.where(spread > 0, norm, 1.0)
+    return np.where(valid, norm * 100, 0.0)
+
+
+def official_scale_points(places: np.ndarray, field_size: Union[int, np.ndarray], year: int = 2024) -> np.ndarray:
+    """
+    Score each event on the season's official scale for its field size (the
+    smallest scale covering it), truncated to the field; other places score 0.
+    """
+    num_events = places.shape[-1]
+    field_size = np.broadcast_to(np.asarray(field_size, dtype=np.int64), (num_events,))
+
+    # One [events x places] table with each event's scale
+    width = max(int(field_size.max(initial=0)), int(places.max(initial=0))) + 1
+    table = np.zeros((num_events, width), dtype=np.int64)
+    for j, size in enumerate(field_size.tolist()):
+        scale = scale_tables.official_scale_array(year, size)
+        table[j, : len(scale)] = scale
+    return table[np.arange(num_events), places]
+
+
+# --------------------------
+# Method registry
+# --------------------------
+ScoringKernel = Callable[..., np.ndarray]
+
+
+class ScoringMethod(NamedTuple):
+    name: str
+    kernel: ScoringKernel  # (places, raw, field_size, **params) -> points
+    by_place: bool  # points depend only on (event, place), so ±1 swaps move them
+
+
+SCORING_METHODS: Dict[str, ScoringMethod] = {}
+
+
+def register_method(name: str, kernel: Optional[ScoringKernel] = None, by_place: bool = True):
+    """Register a scoring kernel under `name`; usable directly or as a decorator."""
+
+    def register(kernel: ScoringKernel) -> ScoringKernel:
+        SCORING_METHODS[name] = ScoringMethod(name, kernel, by_place)
+        return kernel
+
+    return register(kernel) if kernel is not None else register
+
+
+def get_method(name: str) -> ScoringMethod:
+    try:
+        return SCORING_METHODS[name]
+    except KeyError:
+        raise ValueError(f"Unknown scoring method {name}") from None
+
+
+def method_names() -> List[str]:
+    return list(SCORING_METHODS)
+
+
+register_method("official", lambda places, raw, field_size, event_scales, **params: official_points(places, event_scales))
+register_method("linear", lambda places, raw, field_size, **params: linear_points(places, field_size))
+register_method("normalized", lambda places, raw, field_size, **params: normalized_points(places, field_size))
+register_method(
+    "continuous",
+    lambda places, raw, field_size, lower_is_better, **params: continuous_points(raw, lower_is_better),
+    by_place=False,
+)
+register_method("decay", lambda places, raw, field_size, k=0.5, **params: decay_points(places, k))
+register_method("official_2024", lambda places, raw, field_size, **params: official_scale_points(places, field_size, 2024))
+
+METHODS = tuple(SCORING_METHODS)
+
+
+# --------------------------
+# Matrix dispatch
+# --------------------------
+def batch_points(
+    matrix: LeaderboardMatrix,
+    method: str = "official",
+    k=0.5,
+    places: Optional[np.ndarray] = None,
+    raw: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Points matrix for `method`, scored from `places` and `raw` (default: the
+    matrix's own). Every event's field size is the number of athletes.
+    For method="decay", a vector of k values returns a [k x athletes x events] tensor.
+    """
+    if places is None:
+        places = matrix.places
+    if raw is None:
+        raw = matrix.raw
+    field_size = np.full(matrix.num_events, matrix.num_athletes, dtype=np.int64)
+    return get_method(method).kernel(
+        places,
+        raw,
+        field_size,
+        event_scales=matrix.event_scales,
+        lower_is_better=matrix.lower_is_better,
+        k=k,
+    )
+
+
+def place_scale(matrix: LeaderboardMatrix, event_idx: int, method: str = "official", k=0.5) -> Optional[np.ndarray]:
+    """Points by place for one event (index 0 unused), or None if the method scores raw results."""
+    scoring = get_method(method)
+    if not scoring.by_place:
+        return None
+    if method == "official":
+        return matrix.event_scales[event_idx].astype(np.int64)
+    # Score every place of every event at once and keep this event's column
+    num_places = len(matrix.event_scales[event_idx])
+    places = np.broadcast_to(np.arange(num_places)[:, None], (num_places, matrix.num_events))
+    return batch_points(matrix, method, k=k, places=places)[:, event_idx]
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Parallel scoring-method / decay-k fragility sweep.
+
+Every (dataset, method, k) job is independent, so jobs are fanned out over a
+process pool. Datasets are loaded once in the parent and handed to each worker
+once through the pool initializer (inherited copy-on-write under fork), never
+re-pickled per task. Rows are streamed to results/fragility_sweep*.csv as jobs
+finish, so row order follows completion order. With --profile, each worker's
+stage timings are merged into results/fragility_sweep.profile.json.
+
+Example:
+    python scripts/sweep_runner.py --workers 32 --k-range 0.01 2.0 400 \
+        --dataset men=crossfit-leaderboard-remix/public/leaderboard_data-men.json \
+        --dataset women=crossfit-leaderboard-remix/public/leaderboard_data-women.json
+"""
+
+import argparse
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+import profiling
+from datasets import output_suffix
+from fragility import FIELDNAMES, analyze
+from leaderboard_matrix import LeaderboardMatrix
+
+
+DEFAULT_DATASETS = [
+    "men=crossfit-leaderboard-remix/public/leaderboard_data-men.json",
+    "women=crossfit-leaderboard-remix/public/leaderboard_data-women.json",
+]
+DEFAULT_METHODS = ["official", "linear", "normalized", "continuous", "decay"]
+DEFAULT_KS = [0.01, 0.05, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0, 1.25, 1.5, 1.75, 2.0]
+
+# Worker-side read-only datasets, set once per process by _init_worker()
+_DATASETS: Dict[str, LeaderboardMatrix] = {}
+
+
+def _init_worker(datasets: Dict[str, LeaderboardMatrix], profile: Optional[bool] = None) -> None:
+    global _DATASETS
+    _DATASETS = datasets
+    if profile is not None and not profiling.enabled():
+        profiling.enable(memory=profile)
+
+
+def _run_job(job: Tuple[str, str, float]) -> Tuple[str, Dict, Optional[Dict]]:
+    """Row for one job, plus the worker's profile of it when profiling."""
+    label, method, k = job
+    profiling.reset()
+    row = analyze(_DATASETS[label], method, k=k)
+    return label, row, profiling.summary() if profiling.enabled() else None
+
+
+def output_path(label: str, results_dir: str = "results") -> Path:
+    return Path(results_dir) / f"fragility_sweep{output_suffix(label)}.csv"
+
+
+def resolve_ks(k: Optional[List[float]] = None, k_range: Optional[List[float]] = None) -> List[float]:
+    """Decay k values from an explicit list or a (start, stop, num) range, else the historical 16."""
+    if k_range:
+        start, stop, num = k_range
+        return [round(v, 6) for v in np.linspace(start, stop, int(num)).tolist()]
+    return k or DEFAULT_KS
+
+
+def build_jobs(labels: List[str], methods: List[str], ks: List[float]) -> List[Tuple[str, str, float]]:
+    jobs = []
+    for label in labels:
+        for method in methods:
+            if method == "decay":
+                jobs.extend((label, method, k) for k in ks)
+            else:
+                jobs.append((label, method, 0.5))
+    return jobs
+
+
+def run_sweep(
+    datasets: Dict[str, LeaderboardMatrix],
+    methods: List[str],
+    ks: List[float],
+    workers: int,
+    results_dir: str = "results",
+) -> None:
+    jobs = build_jobs(list(datasets), methods, ks)
+    Path(results_dir).mkdir(exist_ok=True)
+
+    files = {label: open(output_path(label, results_dir), "w", newline="") for label in datasets}
+    try:
+        writers = {}
+        for label, f in files.items():
+            writers[label] = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writers[label].writeheader()
+
+        profiling.reset()
+        profile = profiling.memory_enabled() if profiling.enabled() else None
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(datasets, profile)) as pool:
+            futures = [pool.submit(_run_job, job) for job in jobs]
+            for done, future in enumerate(as_completed(futures), start=1):
+                label, row, job_profile = future.result()
+                if job_profile:
+                    profiling.merge(job_profile)
+                writers[label].writerow(row)
+                files[label].flush()
+                print(f"[{done}/{len(jobs)}] {label}: {row}")
+    finally:
+        for f in files.values():
+            f.close()
+
+    # Stage times are summed over workers, so they can exceed the wall time
+    profiling.write_summary(
+        str(Path(results_dir) / "fragility_sweep.profile.json"),
+        {"jobs": len(jobs), "workers": workers, "wall_seconds": round(time.perf_counter() - start, 6)},
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parallel JME fragility sweep over scoring methods and decay k.")
+    parser.add_argument("--dataset", action="append", metavar="LABEL=PATH", help="leaderboard JSON to sweep (repeatable)")
+    parser.add_argument("--methods", nargs="+", default=DEFAULT_METHODS, help="scoring methods to run")
+    parser.add_argument("--k", nargs="+", type=float, help="explicit decay k values")
+    parser.add_argument("--k-range", nargs=3, type=float, metavar=("START", "STOP", "NUM"), help="evenly spaced decay k values")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--results-dir", default="results")
+    parser.add_argument("--profile", action="store_true", help="write per-stage timings to results/fragility_sweep.profile.json")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable()
+
+    ks = resolve_ks(args.k, args.k_range)
+
+    datasets = {}
+    for spec in args.dataset or DEFAULT_DATASETS:
+        label, path = spec.split("=", 1)
+        datasets[label] = LeaderboardMatrix.load(path)
+
+    run_sweep(datasets, args.methods, ks, args.workers, args.results_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Synthetic leaderboards at arbitrary field sizes, shaped like the real exports."""
+
+import csv
+import random
+from typing import List, Optional
+
+from scale_tables import get_place_string
+
+
+EVENT_KINDS = ("time", "time", "time", "load", "cap")
+
+
+def format_time(seconds: float) -> str:
+    minutes, sec = divmod(seconds, 60)
+    if minutes >= 60:
+        hours, minutes = divmod(minutes, 60)
+        return f"{int(hours)}:{int(minutes):02d}:{sec:05.2f}"
+    return f"{int(minutes):02d}:{sec:05.2f}"
+
+
+def synthetic_events(num_events: int) -> List[str]:
+    """Event names; every fifth event is a lift so the raw-score parsers see loads."""
+    return [f"1RM Back Squat {i + 1}" if i % 5 == 3 else f"Event {i + 1}" for i in range(num_events)]
+
+
+def synthetic_results(num_athletes: int, event: str, rng: random.Random, cap_fraction: float = 0.15) -> List[str]:
+    """Raw result cells for one event, best first, in the CSV/JSON `time` format."""
+    if "Back Squat" in event:
+        top = rng.uniform(400, 550)
+        return [f"{int(top - i * 150 / max(num_athletes, 1))} lb" for i in range(num_athletes)]
+
+    base = rng.uniform(120, 3000)
+    capped = int(num_athletes * cap_fraction) if rng.random() < 0.5 else 0
+    finished = num_athletes - capped
+    times = sorted(base * (1 + rng.expovariate(8.0)) for _ in range(finished))
+    caps = sorted(rng.randint(1, 60) for _ in range(capped))
+    return [format_time(t) for t in times] + [f"CAP+{c}" for c in caps]
+
+
+def write_synthetic_csv(path: str, num_athletes: int, num_events: int = 10, seed: int = 0, point_step: int = 3) -> None:
+    """Write a CSV in the xfit-leaderboard-<year>-<M|W>.csv export format."""
+    rng = random.Random(seed)
+    events = synthetic_events(num_events)
+
+    # Each event is an independent random finish order
+    columns = []
+    for event in events:
+        results = synthetic_results(num_athletes, event, rng)
+        order = list(range(num_athletes))
+        rng.shuffle(order)
+        cells: List[Optional[str]] = [None] * num_athletes
+        for place0, athlete in enumerate(order):
+            place = place0 + 1
+            points = max(0, 100 - point_step * place0)
+            cells[athlete] = f"{get_place_string(place)} ({results[place0]}) {points} pts"
+        columns.append(cells)
+
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["RANK", "NAME", "POINTS"] + events)
+        for i in range(num_athletes):
+            name = (
+                f"Athlete {i + 1}\nCountry {i % 50}\nRegion {i % 7}\nAffiliate {i % 997}\n"
+                f"Age {18 + i % 30}\n{60 + i % 20} in | {150 + i % 80} lb\nView Profile"
+            )
+            writer.writerow([i + 1, name, 0] + [col[i] for col in columns])
+
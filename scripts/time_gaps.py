@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""Numeric finish-order arrays for the time-gap reports.
+
+Each event's entry in the converter's `event_finish_index` (or, in files
+that carry them, the older `event_finish_order` rows) becomes place-sorted
+arrays, so questions like "how many places above this athlete finished within
+Δ seconds" become searchsorted queries, and "how far behind the nearest faster
+finisher" a gather from a forward-filled column, over the whole field at once
+instead of walks up the finish order per athlete.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from finish_index import EventFinishIndex, load_finish_index
+from raw_scores import ScoreCache
+
+
+def _sparse_table(values: np.ndarray, reduce) -> List[np.ndarray]:
+    """table[level][i] = reduce(values[i : i + 2**level])."""
+    table = [values]
+    span = 1
+    while 2 * span <= len(values):
+        prev = table[-1]
+        table.append(reduce(prev[:-span], prev[span:]))
+        span *= 2
+    return table
+
+
+def _extend_left(table: List[np.ndarray], pos: np.ndarray, ok) -> np.ndarray:
+    """Move each pos left over the longest run of blocks whose reduced value satisfies ok()."""
+    pos = pos.copy()
+    for level in range(len(table) - 1, -1, -1):
+        cand = pos - (1 << level)
+        fits = cand >= 0
+        safe = np.where(fits, cand, 0)
+        fits &= ok(table[level][safe])
+        pos = np.where(fits, cand, pos)
+    return pos
+
+
+class EventTimes:
+    """
+    places : int64 [m] places with at least one parseable time, ascending
+    best   : float64 [m] fastest parseable time at each of those places
+    first  : float64 [m] first parseable time at each of those places, in row order
+    points : int64 [max place + 1] points per place, best over tied rows (-1 = no row)
+    previous_first : float64 [places[-1] + 2] `first` of the nearest timed place
+                     strictly above each place, forward-filled (NaN if none)
+    """
+
+    def __init__(self, places: np.ndarray, best: np.ndarray, first: np.ndarray, points: np.ndarray) -> None:
+        self.places = places
+        self.best = best
+        self.first = first
+        self.points = points
+
+        size = (int(places[-1]) if len(places) else 0) + 2
+        owner = np.full(size, -1, dtype=np.int64)
+        owner[places + 1] = np.arange(len(places))
+        owner = np.maximum.accumulate(owner)
+        self.previous_first = np.where(owner >= 0, np.append(first, np.nan)[owner], np.nan)
+
+        # Timed events list places fastest first; anything else falls back to range tables
+        self.monotonic = bool(np.all(np.diff(best) >= 0))
+        self._min_table = None
+        self._max_table = None
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict], scores: ScoreCache) -> "EventTimes":
+        best: Dict[int, float] = {}
+        first: Dict[int, float] = {}
+        points: Dict[int, int] = {}
+        for r in rows:
+            place = int(r.get("place", 0) or 0)
+            pts = int(r.get("points", 0) or 0)
+            if place and (place not in points or pts > points[place]):
+                points[place] = pts
+            t = scores.seconds(str(r.get("time", "") or ""))
+            if place > 0 and t is not None:
+                if place not in best or t < best[place]:
+                    best[place] = t
+                first.setdefault(place, t)
+
+        places = np.array(sorted(best), dtype=np.int64)
+        lookup = np.full(max(points, default=0) + 1, -1, dtype=np.int64)
+        for place, pts in points.items():
+            if place > 0:
+                lookup[place] = pts
+        order = places.tolist()
+        return cls(
+            places,
+            np.array([best[p] for p in order], dtype=np.float64),
+            np.array([first[p] for p in order], dtype=np.float64),
+            lookup,
+        )
+
+    @classmethod
+    def from_index(cls, index: EventFinishIndex) -> "EventTimes":
+        """Same arrays as from_rows(), straight from a finish index (positions are already place-sorted)."""
+        seconds = index.seconds
+        timed = ~np.isnan(seconds)
+        places, start = np.unique(index.places[timed], return_index=True)
+        times = seconds[timed]
+        best = np.minimum.reduceat(times, start) if len(times) else times
+        return cls(places, best, times[start], index.points_by_place)
+
+    def points_at(self, places: np.ndarray, default: np.ndarray) -> np.ndarray:
+        """Points for each place, `default` where no row had that place."""
+        inside = (places >= 0) & (places < len(self.points))
+        pts = self.points[np.where(inside, places, 0)]
+        return np.where(inside & (pts >= 0), pts, default)
+
+    def previous_first_at(self, places: np.ndarray) -> np.ndarray:
+        """First parseable time of the nearest timed place strictly above each place (NaN if none)."""
+        return self.previous_first[np.clip(places, 0, len(self.previous_first) - 1)]
+
+    def _after_last_slower(self, above: np.ndarray, my_time: np.ndarray) -> np.ndarray:
+        """1 + index of the nearest entry above with a time slower than my_time (0 if none)."""
+        if self.monotonic:
+            first_slower = np.searchsorted(self.best, my_time, side="right")
+            return np.where(first_slower < above, above, 0)
+        if self._max_table is None:
+            self._max_table = _sparse_table(self.best, np.maximum)
+        return _extend_left(self._max_table, above, lambda v: v <= my_time)
+
+    def _after_last_outside(self, above: np.ndarray, my_time: np.ndarray, thresh: float) -> np.ndarray:
+        """
+        1 + index of the nearest entry above more than thresh seconds faster
+        than my_time (0 if none). The gap is compared as my_time - t in
+        floating point, exactly as the report computes it.
+        """
+        if self.monotonic:
+            # Gaps shrink along the fastest-first entries: binary search for the first that fits
+            lo = np.zeros_like(above)
+            hi = above.copy()
+            while True:
+                active = lo < hi
+                if not active.any():
+                    return lo
+                mid = (lo + hi) // 2
+                fits = my_time - self.best[np.where(active, mid, 0)] <= thresh
+                hi = np.where(active & fits, mid, hi)
+                lo = np.where(active & ~fits, mid + 1, lo)
+        if self._min_table is None:
+            self._min_table = _sparse_table(self.best, np.minimum)
+        # A block fits when its fastest time does: the gap only shrinks for slower times
+        return _extend_left(self._min_table, above, lambda v: my_time - v <= thresh)
+
+
+class WithinQuery:
+    """
+    For each athlete (place, my_time) in one event: the number of consecutive
+    timed places directly above whose best time is between 0 and thresh seconds
+    faster. Prepared once so a threshold sweep costs a few searchsorted passes
+    per threshold; queries are held sorted by time, which keeps those passes
+    cache-friendly, and count() returns them in that order (place[order]).
+    """
+
+    def __init__(self, times: EventTimes, place: np.ndarray, my_time: np.ndarray) -> None:
+        self.times = times
+        self.order = np.argsort(my_time, kind="stable")
+        self.my_time = my_time[self.order]
+        self.above = np.searchsorted(times.places, place[self.order], side="left")
+        self.slower = times._after_last_slower(self.above, self.my_time) if len(times.best) else self.above
+
+    def count(self, thresh: float) -> np.ndarray:
+        """
+        Places within thresh seconds for each query, in time order. A
+        threshold at or past an athlete's own time counts every faster place:
+
+        >>> times = EventTimes(np.array([1, 2]), np.array([2.0, 5.0]), np.array([2.0, 5.0]), np.array([-1, 100, 97]))
+        >>> query = WithinQuery(times, np.array([3, 3]), np.array([5.5, 9.4]))
+        >>> query.count(9.4).tolist(), query.count(30.0).tolist(), query.count(4.4).tolist()
+        ([2, 2], [2, 2], [2, 1])
+        """
+        if not len(self.times.best):
+            return np.zeros(len(self.order), dtype=np.int64)
+        below = self.times._after_last_outside(self.above, self.my_time, thresh)
+        return self.above - np.maximum(self.slower, below)
+
+
+class TimeGapIndex:
+    """
+    Per-event EventTimes plus the athletes' own (place, time, points) as
+    [athletes x events] arrays; time is NaN wherever the report skips the cell.
+    """
+
+    def __init__(self, names: List[str], events: List[str], event_times: List[EventTimes],
+                 place: np.ndarray, my_time: np.ndarray, points: np.ndarray) -> None:
+        self.names = names
+        self.events = events
+        self.event_times = event_times
+        self.place = place
+        self.my_time = my_time
+        self.points = points
+
+    @classmethod
+    def from_data(cls, data: Dict) -> "TimeGapIndex":
+        events: List[str] = data.get("events", [])
+        athletes: List[Dict] = data.get("athletes", [])
+        if "event_finish_order" in data and "event_finish_index" not in data:
+            return cls._from_finish_order(data)
+
+        indexes = load_finish_index(data)
+        event_times = [EventTimes.from_index(indexes[ev]) for ev in events]
+        shape = (len(athletes), len(events))
+        place = np.zeros(shape, dtype=np.int64)
+        my_time = np.full(shape, np.nan, dtype=np.float64)
+        points = np.zeros(shape, dtype=np.int64)
+        for j, ev in enumerate(events):
+            index = indexes[ev]
+            place[index.athletes, j] = index.places
+            # no one above first place
+            my_time[index.athletes, j] = np.where(index.places > 1, index.seconds, np.nan)
+        for i, athlete in enumerate(athletes):
+            perfs: Dict[str, Dict] = athlete.get("events", {})
+            for j, ev in enumerate(events):
+                perf = perfs.get(ev)
+                if perf:
+                    points[i, j] = int(perf.get("points", 0) or 0)
+
+        return cls([a.get("name", "") for a in athletes], events, event_times, place, my_time, points)
+
+    @classmethod
+    def _from_finish_order(cls, data: Dict) -> "TimeGapIndex":
+        """Files with `event_finish_order` rows ({"name", "place", "time", "points"}) and no index."""
+        events: List[str] = data.get("events", [])
+        finish_order: Dict[str, List[Dict]] = data.get("event_finish_order", {})
+        athletes: List[Dict] = data.get("athletes", [])
+        scores = ScoreCache()
+
+        event_times = [EventTimes.from_rows(finish_order.get(ev, []), scores) for ev in events]
+        shape = (len(athletes), len(events))
+        place = np.zeros(shape, dtype=np.int64)
+        my_time = np.full(shape, np.nan, dtype=np.float64)
+        points = np.zeros(shape, dtype=np.int64)
+        for i, athlete in enumerate(athletes):
+            perfs: Dict[str, Dict] = athlete.get("events", {})
+            for j, ev in enumerate(events):
+                perf = perfs.get(ev)
+                if not perf:
+                    continue
+                place[i, j] = int(perf.get("place", 0) or 0)
+                points[i, j] = int(perf.get("points", 0) or 0)
+                if place[i, j] <= 1:
+                    continue  # no one above
+                t = scores.seconds(str(perf.get("time", "") or "").strip())
+                if t is not None:
+                    my_time[i, j] = t
+
+        return cls([a.get("name", "") for a in athletes], events, event_times, place, my_time, points)
+
+    def points_gain(self, thresholds: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (gains, events_used), each [thresholds x athletes]: points gained by closing
+        every gap of at most thresh seconds, and the number of events that gained.
+        """
+        gains = np.zeros((len(thresholds), len(self.names)), dtype=np.int64)
+        used = np.zeros((len(thresholds), len(self.names)), dtype=np.int64)
+        for j, times in enumerate(self.event_times):
+            rows = np.flatnonzero(~np.isnan(self.my_time[:, j]))
+            query = WithinQuery(times, self.place[rows, j], self.my_time[rows, j])
+            rows = rows[query.order]
+            place = self.place[rows, j]
+            old_pts = self.points[rows, j]
+            for i, thresh in enumerate(thresholds):
+                counts = query.count(thresh)
+                new_pts = times.points_at(np.maximum(1, place - counts), old_pts)
+                gain = np.where(counts > 0, np.maximum(0, new_pts - old_pts), 0)
+                gains[i, rows] += gain
+                used[i, rows] += gain > 0
+        return gains, used
+
+    def nearest_gaps(self) -> np.ndarray:
+        """
+        [athletes x events] seconds behind the nearest strictly better place with
+        a parseable time, plus 0.01 and floored at 0 (NaN where there is none).
+        """
+        gaps = np.full(self.my_time.shape, np.nan, dtype=np.float64)
+        for j, times in enumerate(self.event_times):
+            gaps[:, j] = np.maximum(0.0, self.my_time[:, j] - times.previous_first_at(self.place[:, j]) + 0.01)
+        return gaps
+
+    def gap_stats(self, percentiles: Sequence[float] = ()) -> Dict[str, np.ndarray]:
+        """grouped_stats() of nearest_gaps() per athlete row."""
+        gaps = self.nearest_gaps()
+        rows, _ = np.nonzero(~np.isnan(gaps))
+        return grouped_stats(rows, gaps[~np.isnan(gaps)], len(self.names), percentiles)
+
+
+# --------------------------
+# Grouped reductions
+# --------------------------
+def grouped_stats(group: np.ndarray, values: np.ndarray, num_groups: int, percentiles: Sequence[float] = ()) -> Dict[str, np.ndarray]:
+    """
+    Per-group count, median, mean, min, max and p<q> (linear interpolation, as
+    np.percentile) of `values`, in one sort. Groups without values get count 0
+    and NaN statistics. Medians of even counts average the two middle values,
+    matching statistics.median.
+    """
+    count = np.bincount(group, minlength=num_groups)
+    has = count > 0
+    start = np.concatenate(([0], np.cumsum(count)[:-1]))
+    # Values sorted within each group; the trailing NaN serves empty groups
+    ordered = np.append(values[np.lexsort((values, group))], np.nan)
+
+    def at(offset: np.ndarray) -> np.ndarray:
+        return ordered[np.where(has, start + offset, len(ordered) - 1)]
+
+    stats = {
+        "count": count,
+        "median": (at((count - 1) // 2) + at(count // 2)) / 2,
+        "mean": np.where(has, np.bincount(group, weights=values, minlength=num_groups) / np.maximum(count, 1), np.nan),
+        "min": at(np.zeros_like(count)),
+        "max": at(count - 1),
+    }
+    for q in percentiles:
+        pos = (np.maximum(count, 1) - 1) * (q / 100.0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(count - 1, 0))
+        stats[f"p{q:g}"] = at(lo) + (at(hi) - at(lo)) * (pos - lo)
+    return stats
+
+
+def pooled_gap_stats(indexes: Sequence[TimeGapIndex], percentiles: Sequence[float] = ()) -> Tuple[List[str], Dict[str, np.ndarray]]:
+    """gap_stats() over several datasets (e.g. every season) at once, grouping athletes by name."""
+    name_ids: Dict[str, int] = {}
+    groups, values = [], []
+    for index in indexes:
+        ids = np.array([name_ids.setdefault(name, len(name_ids)) for name in index.names], dtype=np.int64)
+        gaps = index.nearest_gaps()
+        valid = ~np.isnan(gaps)
+        rows, _ = np.nonzero(valid)
+        groups.append(ids[rows])
+        values.append(gaps[valid])
+    group = np.concatenate(groups) if groups else np.zeros(0, dtype=np.int64)
+    value = np.concatenate(values) if values else np.zeros(0, dtype=np.float64)
+    return list(name_ids), grouped_stats(group, value, len(name_ids), percentiles)
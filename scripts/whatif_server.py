@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""Local what-if rescoring service for large fields.
+
+The React app re-ranks the whole field in the browser, which is fine for 40
+athletes but not for Semifinal or Open-sized fields. This service keeps every
+selected dataset resident as a LeaderboardMatrix and answers batched "athlete X
+moves to place P in event E" edits with only the window of ranks that changed.
+It needs nothing beyond the standard library and NumPy (asyncio streams, a
+minimal HTTP/1.1 with keep-alive).
+
+    POST /whatif {"dataset": "men", "method": "official",
+                  "edits": [{"athlete": "Jayson Hopper", "event": "Running Isabel", "place": 5}]}
+    -> {"window": [first_rank, last_rank], "rows": [...], "changed": n, "truncated": false}
+
+    GET /datasets, GET /leaderboard?dataset=men&method=official&start=1&limit=50, GET /stats
+
+An edit moves the athlete to the finish position holding place P; everyone in
+between shifts one position and every position keeps its place (and points),
+like RippleEngine.moves(). Edits apply in order. Athletes and events are given
+by ID (row / column, as /leaderboard and /datasets list them) or by name where
+no other athlete shares it. Identical requests in flight at the same time
+share one computation, and results are cached per dataset.
+
+    python scripts/whatif_server.py serve --division men --division women --port 8765
+    python scripts/whatif_server.py loadtest --division men --requests 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import sys
+import time
+import traceback
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from datasets import DEFAULT_DATA_DIR, find_datasets
+from leaderboard_matrix import LeaderboardMatrix
+from scoring import batch_points, get_method, place_scale
+
+
+# Edit batches are a few KB; anything far bigger is refused before it is read
+MAX_BODY = 1 << 20
+
+
+class WhatIfError(ValueError):
+    """A request the service cannot answer (reported as HTTP 400)."""
+
+
+# --------------------------
+# Rescoring core
+# --------------------------
+class Baseline:
+    """
+    points : [athletes x events] points under one method
+    scales : per-event place -> points arrays
+    totals, ranks, order : as returned by compute_leaderboard()
+    """
+
+    def __init__(self, matrix: LeaderboardMatrix, method: str, k: float) -> None:
+        self.points = batch_points(matrix, method, k=k)
+        self.scales = [place_scale(matrix, j, method=method, k=k) for j in range(matrix.num_events)]
+        self.ranks, self.order, self.totals = matrix.compute_leaderboard(self.points)
+
+
+class WhatIfModel:
+    """One resident dataset: baselines per (method, k) and an LRU of edit results."""
+
+    def __init__(self, matrix: LeaderboardMatrix, cache_size: int = 4096) -> None:
+        self.matrix = matrix
+        # Finish order of every event (stable on row order, like the ripple engine)
+        self.finishers = np.argsort(matrix.places, axis=0, kind="stable")
+        self.sorted_places = np.take_along_axis(matrix.places.astype(np.int64), self.finishers, axis=0)
+        self._baselines: Dict[Tuple[str, float], Baseline] = {}
+        self.cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self.cache_size = cache_size
+
+    def baseline(self, method: str, k: float) -> Baseline:
+        key = (method, k)
+        if key not in self._baselines:
+            if not get_method(method).by_place:
+                raise WhatIfError(f"Method {method} scores raw results; place edits do not apply")
+            self._baselines[key] = Baseline(self.matrix, method, k)
+        return self._baselines[key]
+
+    def resolve_edits(self, edits: Sequence[Dict]) -> Tuple[Tuple[int, int, int], ...]:
+        """(athlete ID, event ID, place) per edit; athletes and events by ID or unambiguous name."""
+        m = self.matrix
+        resolved = []
+        for edit in edits:
+            try:
+                athlete, event, place = edit["athlete"], edit["event"], int(edit["place"])
+            except (KeyError, TypeError, ValueError):
+                raise WhatIfError(f"Edits need athlete, event and an integer place: {edit!r}") from None
+            if not all(isinstance(key, (int, str)) and not isinstance(key, bool) for key in (athlete, event)):
+                raise WhatIfError(f"Athletes and events are given by ID or name: {edit!r}")
+            try:
+                row = m.athlete_ids.resolve(athlete)
+            except KeyError:
+                raise WhatIfError(f"Unknown athlete {athlete!r}") from None
+            except ValueError as exc:
+                raise WhatIfError(f"{exc}; pass the athlete ID instead") from None
+            try:
+                col = m.event_ids.resolve(event)
+            except (KeyError, ValueError):
+                raise WhatIfError(f"Unknown event {event!r}") from None
+            if place < 1:
+                raise WhatIfError(f"Place must be at least 1: {place}")
+            resolved.append((int(row), int(col), place))
+        return tuple(resolved)
+
+    def apply(self, edits: Tuple[Tuple[int, int, int], ...], method: str, k: float, max_rows: int = 500) -> Dict:
+        base = self.baseline(method, k)
+        points = base.points.copy()
+        places = self.matrix.places.astype(np.int64)
+
+        finish: Dict[int, List[int]] = {}
+        for row, col, place in edits:
+            order = finish.setdefault(col, self.finishers[:, col].tolist())
+            order.remove(row)
+            # The first position holding place >= P (the last position for places past the field)
+            position = min(int(np.searchsorted(self.sorted_places[:, col], place, side="left")), len(order))
+            order.insert(position, row)
+        for col, order in finish.items():
+            places[order, col] = self.sorted_places[:, col]
+            points[:, col] = base.scales[col][places[:, col]]
+
+        ranks, order, totals = self.matrix.compute_leaderboard(points)
+        changed = np.flatnonzero(ranks != base.ranks)
+        if not changed.size:
+            return {"window": None, "rows": [], "changed": 0, "truncated": False}
+
+        first = int(min(ranks[changed].min(), base.ranks[changed].min()))
+        last = int(max(ranks[changed].max(), base.ranks[changed].max()))
+        shown = order[first - 1 : min(last, first - 1 + max_rows)]
+        rows = [
+            {
+                "id": a,
+                "name": self.matrix.names[a],
+                "rank": int(ranks[a]),
+                "previous_rank": int(base.ranks[a]),
+                "total_points": totals[a].item(),
+                "previous_total_points": base.totals[a].item(),
+            }
+            for a in shown.tolist()
+        ]
+        return {"window": [first, last], "rows": rows, "changed": int(changed.size), "truncated": last - first + 1 > max_rows}
+
+    def leaderboard(self, method: str, k: float, start: int = 1, limit: int = 50) -> Dict:
+        base = self.baseline(method, k)
+        shown = base.order[max(start, 1) - 1 : max(start, 1) - 1 + limit]
+        return {
+            "num_athletes": self.matrix.num_athletes,
+            "rows": [
+                {"id": a, "name": self.matrix.names[a], "rank": int(base.ranks[a]), "total_points": base.totals[a].item()}
+                for a in shown.tolist()
+            ],
+        }
+
+
+# --------------------------
+# HTTP service
+# --------------------------
+class WhatIfService:
+    def __init__(self, models: Dict[str, WhatIfModel]) -> None:
+        self.models = models
+        self._inflight: Dict[Tuple, "asyncio.Future[Dict]"] = {}
+        self.stats = {"requests": 0, "computed": 0, "cache_hits": 0, "coalesced": 0, "errors": 0}
+
+    def model(self, label: Optional[str]) -> WhatIfModel:
+        if not isinstance(label, str) or label not in self.models:
+            raise WhatIfError(f"Unknown dataset {label!r}; have {sorted(self.models)}")
+        return self.models[label]
+
+    async def whatif(self, body: Dict) -> Dict:
+        model = self.model(body.get("dataset"))
+        method = body.get("method", "official")
+        if not isinstance(method, str):
+            raise WhatIfError(f"Method must be a string: {method!r}")
+        try:
+            k = float(body.get("k", 0.5))
+            max_rows = int(body.get("max_rows", 500))
+        except (TypeError, ValueError):
+            raise WhatIfError("k and max_rows must be numbers") from None
+        edits = body.get("edits") or []
+        if not isinstance(edits, list):
+            raise WhatIfError("edits must be a list")
+        edits = model.resolve_edits(edits)
+        key = (method, k, max_rows, edits)
+
+        cached = model.cache.get(key)
+        if cached is not None:
+            model.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            return cached
+
+        # Coalesce identical requests already being computed
+        inflight_key = (body.get("dataset"),) + key
+        pending = self._inflight.get(inflight_key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[inflight_key] = future
+        try:
+            # NumPy work runs off the event loop so other connections keep being served
+            result = await asyncio.get_running_loop().run_in_executor(None, model.apply, edits, method, k, max_rows)
+            self.stats["computed"] += 1
+            model.cache[key] = result
+            if len(model.cache) > model.cache_size:
+                model.cache.popitem(last=False)
+            future.set_result(result)
+            return result
+        except BaseException as exc:
+            future.set_exception(exc)
+            future.exception()  # retrieved here so waiters alone do not warn
+            raise
+        finally:
+            del self._inflight[inflight_key]
+
+    async def route(self, method: str, target: str, body: bytes) -> Tuple[int, Dict]:
+        url = urlsplit(target)
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        if method == "POST" and url.path == "/whatif":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                raise WhatIfError("Body must be JSON") from None
+            if not isinstance(payload, dict):
+                raise WhatIfError("Body must be a JSON object")
+            return 200, await self.whatif(payload)
+        if method == "GET" and url.path == "/datasets":
+            return 200, {
+                label: {"athletes": m.matrix.num_athletes, "events": m.matrix.events} for label, m in self.models.items()
+            }
+        if method == "GET" and url.path == "/leaderboard":
+            model = self.model(query.get("dataset"))
+            return 200, model.leaderboard(
+                query.get("method", "official"),
+                float(query.get("k", 0.5)),
+                int(query.get("start", 1)),
+                int(query.get("limit", 50)),
+            )
+        if method == "GET" and url.path == "/stats":
+            return 200, self.stats
+        if method == "GET" and url.path == "/health":
+            return 200, {"ok": True}
+        return 404, {"error": f"No route for {method} {url.path}"}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                self.stats["requests"] += 1
+                length = headers.get("content-length", "") or "0"
+                framed = length.isascii() and length.isdigit()
+                if not framed:
+                    self.stats["errors"] += 1
+                    status, payload = 400, {"error": f"Invalid Content-Length {length!r}"}
+                elif len(length) > len(str(MAX_BODY)) or int(length) > MAX_BODY:
+                    self.stats["errors"] += 1
+                    framed = False
+                    status, payload = 413, {"error": f"Request body over {MAX_BODY} bytes"}
+                else:
+                    body = await reader.readexactly(int(length))
+                    try:
+                        status, payload = await self.route(method, target, body)
+                    except ValueError as exc:  # WhatIfError and malformed numbers
+                        self.stats["errors"] += 1
+                        status, payload = 400, {"error": str(exc)}
+                    except Exception:
+                        # Still answer, so a bad request never drops the connection silently
+                        self.stats["errors"] += 1
+                        traceback.print_exc()
+                        status, payload = 500, {"error": "Internal error"}
+
+                data = json.dumps(payload).encode("utf-8")
+                # Without a usable Content-Length the body cannot be skipped, so the connection ends here
+                keep_alive = framed and headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                reason = {
+                    200: "OK",
+                    400: "Bad Request",
+                    404: "Not Found",
+                    413: "Payload Too Large",
+                    500: "Internal Server Error",
+                }[status]
+                writer.write(
+                    f"{version} {status} {reason}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\nAccess-Control-Allow-Origin: *\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def load_models(args: argparse.Namespace) -> Dict[str, WhatIfModel]:
+    models = {}
+    for division in args.division or ["*"]:
+        for year in args.year or ["*"]:
+            for ds in find_datasets(args.dataset, division=division, year=year, data_dir=args.data_dir):
+                models.setdefault(ds.label, WhatIfModel(ds.matrix))
+    if not models:
+        sys.exit("No datasets matched the given --dataset/--division/--year filters")
+    return models
+
+
+async def serve(service: WhatIfService, host: str, port: int) -> asyncio.AbstractServer:
+    return await asyncio.start_server(service.handle, host, port)
+
+
+# --------------------------
+# Load test
+# --------------------------
+async def _request(reader, writer, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    data = await reader.readexactly(length)
+    if b" 200 " not in status_line:
+        raise RuntimeError(f"{status_line.decode().strip()}: {data.decode()}")
+    return json.loads(data)
+
+
+async def load_test(host: str, port: int, requests: int, concurrency: int, edits_per_request: int, distinct: int, seed: int) -> Dict:
+    """
+    `concurrency` keep-alive clients send `requests` what-if batches in total,
+    drawn from `distinct` random edit batches per dataset so the cache and
+    request coalescing are exercised alongside fresh computations.
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+    datasets = await _request(reader, writer, "GET", "/datasets")
+    writer.close()
+    await writer.wait_closed()
+
+    rng = random.Random(seed)
+    pool = []
+    for label, info in datasets.items():
+        for _ in range(distinct):
+            edits = [
+                {
+                    "athlete": rng.randrange(info["athletes"]),
+                    "event": rng.randrange(len(info["events"])),
+                    "place": rng.randint(1, info["athletes"]),
+                }
+                for _ in range(edits_per_request)
+            ]
+            pool.append({"dataset": label, "method": "official", "edits": edits})
+
+    latencies: List[float] = []
+    remaining = [requests]
+
+    async def client() -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                await _request(reader, writer, "POST", "/whatif", rng.choice(pool))
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    stats = await _request(reader, writer, "GET", "/stats")
+    writer.close()
+    await writer.wait_closed()
+
+    latencies.sort()
+
+    def pct(q: float) -> float:
+        return round(latencies[min(int(q / 100 * len(latencies)), len(latencies) - 1)] * 1000, 3)
+
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "latency_ms": {"mean": round(statistics.mean(latencies) * 1000, 3), "p50": pct(50), "p95": pct(95), "p99": pct(99)},
+        "server": stats,
+    }
+
+
+async def _serve_forever(service: WhatIfService, host: str, port: int) -> None:
+    server = await serve(service, host, port)
+    print(f"Serving {sorted(service.models)} on http://{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+async def _local_load_test(service: Optional[WhatIfService], args: argparse.Namespace) -> Dict:
+    host, port = args.host, args.port
+    server = None
+    if service is not None:
+        server = await serve(service, host, 0)
+        port = server.sockets[0].getsockname()[1]
+    try:
+        return await load_test(host, port, args.requests, args.concurrency, args.edits, args.distinct, args.seed)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--dataset", action="append", metavar="GLOB", help="leaderboard JSON path glob (repeatable)")
+    common.add_argument("--division", action="append", metavar="GLOB")
+    common.add_argument("--year", action="append", metavar="GLOB")
+    common.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    common.add_argument("--host", default="127.0.0.1")
+    common.add_argument("--port", type=int, default=8765)
+
+    sub.add_parser("serve", parents=[common], help="run the service")
+
+    p = sub.add_parser("loadtest", parents=[common], help="load-test a service (an in-process one unless --remote)")
+    p.add_argument("--remote", action="store_true", help="target an already running service at --host/--port")
+    p.add_argument("--requests", type=int, default=2000)
+    p.add_argument("--concurrency", type=int, default=32)
+    p.add_argument("--edits", type=int, default=3, help="edits per request")
+    p.add_argument("--distinct", type=int, default=200, help="distinct edit batches per dataset")
+    p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(_serve_forever(WhatIfService(load_models(args)), args.host, args.port))
+    else:
+        service = None if args.remote else WhatIfService(load_models(args))
+        print(json.dumps(asyncio.run(_local_load_test(service, args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()